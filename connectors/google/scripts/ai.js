@@ -13,9 +13,6 @@
 import { ensureDeps } from '../../../system/shared/ensure-deps.js';
 ensureDeps(import.meta.url);
 
-// npm packages (dynamic import after dependency check)
-const { GoogleGenerativeAI } = await import('@google/generative-ai');
-
 // Built-in Node.js modules
 import { readFileSync, writeFileSync, existsSync, mkdirSync, statSync } from 'fs';
 import { dirname, basename, extname } from 'path';
@@ -30,6 +27,7 @@ import {
   loadEnvFile,
   isApiEnabled
 } from './utils.js';
+import { mapConcurrent, withRetry } from '../../../system/shared/utils.js';
 
 // Default models
 const DEFAULT_TEXT_MODEL = 'gemini-2.0-flash';
@@ -37,12 +35,40 @@ const DEFAULT_IMAGE_MODEL = 'gemini-2.0-flash-exp'; // Supports image generation
 const DEFAULT_VIDEO_MODEL = 'veo-2'; // Video generation model
 
 // Supported aspect ratios for image generation
-const SUPPORTED_ASPECT_RATIOS = ['1:1', '3:2', '2:3', '3:4', '4:3', '4:5', '5:4', '9:16', '16:9', '21:9'];
+const SUPPORTED_ASPECT_RATIOS = new Set(['1:1', '3:2', '2:3', '3:4', '4:3', '4:5', '5:4', '9:16', '16:9', '21:9']);
+
+// File extension for each image MIME type Gemini can return
+const IMAGE_EXTENSIONS = {
+  'image/png': '.png',
+  'image/jpeg': '.jpg',
+  'image/webp': '.webp'
+};
+
+// Characters stripped from prompts when deriving output filenames (runs of them removed in one match)
+const UNSAFE_FILENAME_CHARS = /[^a-zA-Z0-9 _-]+/g;
+
+// One client per process; reused across calls (e.g. batch image generation).
+// The promise is cached so concurrent batch calls share a single load.
+let geminiClient = null;
 
 /**
  * Get initialized Gemini client
+ * Cached per process; a failed load is not cached, so callers can retry.
+ * @returns {Promise<GoogleGenerativeAI>} Gemini client
  */
 function getGeminiClient() {
+  if (!geminiClient) {
+    geminiClient = loadGeminiClient();
+    geminiClient.catch(() => { geminiClient = null; });
+  }
+  return geminiClient;
+}
+
+/**
+ * Build the Gemini client from the configured API key
+ * @returns {Promise<GoogleGenerativeAI>} Gemini client
+ */
+async function loadGeminiClient() {
   const apiKey = getGeminiApiKey();
   
   if (!apiKey) {
@@ -56,6 +82,8 @@ function getGeminiClient() {
     );
   }
   
+  // npm package loaded on first use so help and usage errors skip the SDK import
+  const { GoogleGenerativeAI } = await import('@google/generative-ai');
   return new GoogleGenerativeAI(apiKey);
 }
 
@@ -63,7 +91,7 @@ function getGeminiClient() {
  * Test API connection
  */
 async function testConnection() {
-  const genAI = getGeminiClient();
+  const genAI = await getGeminiClient();
   const model = genAI.getGenerativeModel({ model: DEFAULT_TEXT_MODEL });
   
   const result = await model.generateContent('Say "Hello from Gemini" in exactly those words.');
@@ -80,7 +108,7 @@ async function testConnection() {
  * Generate text
  */
 async function generateText(prompt, options = {}) {
-  const genAI = getGeminiClient();
+  const genAI = await getGeminiClient();
   const model = genAI.getGenerativeModel({
     model: options.model || DEFAULT_TEXT_MODEL,
     systemInstruction: options.system || undefined
@@ -105,7 +133,7 @@ async function generateText(prompt, options = {}) {
  * Analyze image with vision
  */
 async function analyzeImage(imagePath, prompt = 'Describe this image in detail.', options = {}) {
-  const genAI = getGeminiClient();
+  const genAI = await getGeminiClient();
   const model = genAI.getGenerativeModel({
     model: options.model || DEFAULT_TEXT_MODEL
   });
@@ -144,11 +172,46 @@ async function analyzeImage(imagePath, prompt = 'Describe this image in detail.'
   };
 }
 
+/**
+ * Resolve where a generated file is saved
+ * An explicit path gets the batch suffix inserted before its extension;
+ * otherwise the name is built from a timestamp and the start of the prompt.
+ */
+function resolveOutputPath(prompt, { output, outputDir, suffix = '', ext }) {
+  if (output) {
+    if (!suffix) {
+      return output;
+    }
+    const outputExt = extname(output);
+    return `${output.slice(0, output.length - outputExt.length)}${suffix}${outputExt}`;
+  }
+  const timestamp = new Date().toISOString().replace(/[-:T]/g, '').slice(0, 15);
+  const safePrompt = prompt.slice(0, 30).replace(UNSAFE_FILENAME_CHARS, '').trim().replaceAll(' ', '-');
+  return `${outputDir}/gemini_${timestamp}_${safePrompt}${suffix}${ext}`;
+}
+
 /**
  * Generate image from text prompt
  */
 async function generateImage(prompt, options = {}) {
-  const genAI = getGeminiClient();
+  // An explicit output path is deterministic: if it already exists from an
+  // earlier run, skip the API call entirely unless --force is given
+  const indexSuffix = options.index ? `_${options.index}` : '';
+  let outputPath = options.output
+    ? resolveOutputPath(prompt, { output: options.output, suffix: indexSuffix })
+    : null;
+  if (outputPath && !options.force && existsSync(outputPath)) {
+    console.log(`Skipping, already exists: ${outputPath}`);
+    return {
+      outputPath,
+      fileSize: `${(statSync(outputPath).size / 1024).toFixed(2)} KB`,
+      aspectRatio: options.aspectRatio || '1:1',
+      textResponse: null,
+      skipped: true
+    };
+  }
+
+  const genAI = await getGeminiClient();
   const model = genAI.getGenerativeModel({
     model: options.model || DEFAULT_IMAGE_MODEL,
     generationConfig: {
@@ -158,9 +221,9 @@ async function generateImage(prompt, options = {}) {
   
   // Validate aspect ratio
   let aspectRatio = options.aspectRatio || '1:1';
-  if (!SUPPORTED_ASPECT_RATIOS.includes(aspectRatio)) {
+  if (!SUPPORTED_ASPECT_RATIOS.has(aspectRatio)) {
     console.log(`Warning: Unsupported aspect ratio '${aspectRatio}'. Using '1:1'.`);
-    console.log(`Supported: ${SUPPORTED_ASPECT_RATIOS.join(', ')}`);
+    console.log(`Supported: ${[...SUPPORTED_ASPECT_RATIOS].join(', ')}`);
     aspectRatio = '1:1';
   }
   
@@ -168,13 +231,16 @@ async function generateImage(prompt, options = {}) {
   console.log(`Prompt: "${prompt.substring(0, 100)}${prompt.length > 100 ? '...' : ''}"`);
   console.log(`Aspect ratio: ${aspectRatio}`);
   
-  const result = await model.generateContent({
+  // Retries 429/5xx (the SDK sets error.status on HTTP errors). Network
+  // failures are rethrown by the SDK without an error code, so they are
+  // not retried here.
+  const result = await withRetry(() => model.generateContent({
     contents: [{ role: 'user', parts: [{ text: prompt }] }],
     generationConfig: {
       responseModalities: ['Text', 'Image'],
       imageConfig: { aspectRatio }
     }
-  });
+  }));
   
   const response = result.response;
   
@@ -184,11 +250,13 @@ async function generateImage(prompt, options = {}) {
   
   // Extract image from response
   let imageData = null;
+  let imageMimeType = null;
   let textResponse = null;
   
   for (const part of response.candidates[0].content.parts) {
     if (part.inlineData && part.inlineData.data) {
       imageData = Buffer.from(part.inlineData.data, 'base64');
+      imageMimeType = part.inlineData.mimeType;
     }
     if (part.text) {
       textResponse = part.text;
@@ -199,16 +267,15 @@ async function generateImage(prompt, options = {}) {
     throw new Error(`No image data in response. ${textResponse ? `API said: ${textResponse}` : ''}`);
   }
   
-  // Determine output path
-  let outputPath = options.output;
+  // Determine output path when none was given (batch runs number each file)
   if (!outputPath) {
-    const outDir = options.outputDir || './generated_images';
-    if (!existsSync(outDir)) {
-      mkdirSync(outDir, { recursive: true });
-    }
-    const timestamp = new Date().toISOString().replace(/[-:T]/g, '').slice(0, 15);
-    const safePrompt = prompt.slice(0, 30).replace(/[^a-zA-Z0-9 _-]/g, '').trim().replace(/ /g, '-');
-    outputPath = `${outDir}/gemini_${timestamp}_${safePrompt}.png`;
+    // Name the file after the format Gemini returned so the bytes can be
+    // written as-is; never decode and re-encode just to match an extension
+    outputPath = resolveOutputPath(prompt, {
+      outputDir: options.outputDir || './generated_images',
+      suffix: indexSuffix,
+      ext: IMAGE_EXTENSIONS[imageMimeType] || '.png'
+    });
   }
   
   // Ensure parent directory exists
@@ -217,10 +284,10 @@ async function generateImage(prompt, options = {}) {
     mkdirSync(parentDir, { recursive: true });
   }
   
-  // Save the image
+  // Save the image (decoded API bytes go straight to disk; no image decode/convert)
   writeFileSync(outputPath, imageData);
   
-  const fileSize = statSync(outputPath).size / 1024;
+  const fileSize = imageData.length / 1024;
   
   return {
     outputPath,
@@ -230,6 +297,24 @@ async function generateImage(prompt, options = {}) {
   };
 }
 
+/**
+ * Generate several images for one prompt concurrently
+ * Requests overlap instead of running back to back; at most `concurrency`
+ * are in flight to stay under Gemini rate limits.
+ */
+async function generateImages(prompt, count, options = {}) {
+  const { concurrency = 5, ...imageOptions } = options;
+  const indexes = Array.from({ length: count }, (_, i) => i + 1);
+
+  return mapConcurrent(indexes, concurrency, async (index) => {
+    try {
+      return { index, ...(await generateImage(prompt, { ...imageOptions, index })) };
+    } catch (error) {
+      return { index, error: error.message };
+    }
+  });
+}
+
 /**
  * Generate video from text prompt (Veo)
  * Note: Video generation may have limited availability
@@ -266,7 +351,7 @@ async function listModels() {
  * Chat conversation
  */
 async function chat(messages, options = {}) {
-  const genAI = getGeminiClient();
+  const genAI = await getGeminiClient();
   const model = genAI.getGenerativeModel({
     model: options.model || DEFAULT_TEXT_MODEL,
     systemInstruction: options.system || undefined
@@ -310,6 +395,9 @@ function printHelp() {
       '--output PATH              Output file path (for image/video)',
       '--output-dir DIR           Output directory',
       '--aspect-ratio RATIO       Image aspect ratio (e.g., 16:9)',
+      '--count N                  Number of images to generate (default: 1)',
+      '--concurrency N            Max parallel image requests (default: 5)',
+      '--force                    Regenerate even if --output already exists',
       '--max-tokens N             Max output tokens',
       '--temperature N            Temperature (0.0-2.0)',
       '--json                     Output as JSON'
@@ -325,6 +413,7 @@ function printHelp() {
       'node ai.js vision ./photo.jpg "What objects are in this image?"',
       'node ai.js image "A futuristic cityscape at sunset" --output ./city.png',
       'node ai.js image "Mountain landscape" --aspect-ratio 16:9',
+      'node ai.js image "Logo concept" --count 4 --output-dir ./logos',
       'node ai.js models'
     ],
     'Notes': [
@@ -385,13 +474,43 @@ async function main() {
       case 'image': {
         if (!args[0]) throw new Error('Prompt required');
         const prompt = args.join(' ');
-        const result = await generateImage(prompt, {
+        const imageOptions = {
           model: flags.model,
           output: flags.output,
           outputDir: flags['output-dir'],
-          aspectRatio: flags['aspect-ratio'] || flags.a
-        });
-        console.log(`\n✓ Image generated`);
+          aspectRatio: flags['aspect-ratio'] || flags.a,
+          force: Boolean(flags.force)
+        };
+        const count = parseInt(flags.count, 10) || 1;
+
+        if (count > 1) {
+          const results = await generateImages(prompt, count, {
+            ...imageOptions,
+            concurrency: parseInt(flags.concurrency, 10) || 5
+          });
+          const failed = results.filter(r => r.error);
+          const skipped = results.filter(r => r.skipped);
+          const generated = results.length - failed.length - skipped.length;
+          console.log(`\n✓ ${generated} of ${count} images generated` +
+            (skipped.length ? `, ${skipped.length} already existed` : ''));
+          for (const r of results) {
+            if (r.error) {
+              console.log(`  [${r.index}] Failed: ${r.error}`);
+            } else if (r.skipped) {
+              console.log(`  [${r.index}] Already exists: ${r.outputPath} (${r.fileSize})`);
+            } else {
+              console.log(`  [${r.index}] ${r.outputPath} (${r.fileSize})`);
+            }
+          }
+          // Any failure fails the run, so scripts notice a partial batch
+          if (failed.length > 0) {
+            process.exit(1);
+          }
+          break;
+        }
+
+        const result = await generateImage(prompt, imageOptions);
+        console.log(`\n✓ Image ${result.skipped ? 'already exists' : 'generated'}`);
         console.log(`  Path: ${result.outputPath}`);
         console.log(`  Size: ${result.fileSize}`);
         console.log(`  Aspect ratio: ${result.aspectRatio}`);
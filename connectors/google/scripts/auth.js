@@ -327,12 +327,33 @@ function startCallbackServer() {
   });
 }
 
+// Authenticated clients by account email, so scripts that build several
+// API instances (e.g. cloud.js) read credentials and refresh tokens once
+const authClients = new Map();
+
 /**
  * Get authenticated OAuth2 client for an account
+ * Cached per process; a failed load is not cached, so callers can retry.
+ * @param {string} email - Account email
+ * @returns {Promise<OAuth2Client>} Authenticated client
+ */
+export function getAuthClient(email) {
+  let client = authClients.get(email);
+  if (!client) {
+    client = loadAuthClient(email);
+    client.catch(() => authClients.delete(email));
+    authClients.set(email, client);
+  }
+  return client;
+}
+
+/**
+ * Load credentials for an account and build its OAuth2 client,
+ * refreshing the access token if it has expired
  * @param {string} email - Account email
  * @returns {Promise<OAuth2Client>} Authenticated client
  */
-export async function getAuthClient(email) {
+async function loadAuthClient(email) {
   const credentials = loadCredentials(email);
   
   if (!credentials) {
@@ -12,7 +12,8 @@
  *   node inference.js help
  */
 
-import { parseArgs, inferenceRequest, inferenceWithRetry, saveBinaryOutput, getExtensionFromContentType, formatBytes } from './utils.js';
+import { parseArgs, loadConfig, inferenceRequest, inferenceWithRetry, saveBinaryOutput, getExtensionFromContentType, formatBytes } from './utils.js';
+import fs from 'fs';
 import path from 'path';
 
 /**
@@ -156,7 +157,6 @@ async function generateEmbeddings(model, texts, options = {}) {
     }
 
     if (options.output) {
-      const fs = await import('fs');
       fs.writeFileSync(options.output, JSON.stringify(result, null, 2));
       console.log(`\nSaved to: ${options.output}`);
     }
@@ -260,8 +260,6 @@ async function summarize(model, text, options = {}) {
  * @param {object} options - Options
  */
 async function transcribe(model, audioPath, options = {}) {
-  const fs = await import('fs');
-  
   if (!fs.existsSync(audioPath)) {
     throw new Error(`Audio file not found: ${audioPath}`);
   }
@@ -273,7 +271,7 @@ async function transcribe(model, audioPath, options = {}) {
   const audioBuffer = fs.readFileSync(audioPath);
   
   // For audio, we send raw binary
-  const config = (await import('./utils.js')).loadConfig();
+  const config = loadConfig();
   const baseUrl = `https://api-inference.huggingface.co/models/${model}`;
   
   const response = await fetch(baseUrl, {
@@ -13,9 +13,13 @@
  */
 
 import { parseArgs, apiRequest, pollPrediction, downloadFile, formatDuration, formatBytes, getExtension } from './utils.js';
+import { mapConcurrent } from '../../../system/shared/utils.js';
 import path from 'path';
 import fs from 'fs';
 
+// Output files downloaded at once for multi-output predictions
+const DOWNLOAD_CONCURRENCY = 4;
+
 /**
  * Create and run a prediction
  * @param {string} model - Model identifier (owner/name or owner/name:version)
@@ -86,6 +90,35 @@ async function runPrediction(model, input, wait, downloadDir, verbose) {
   return completed;
 }
 
+/**
+ * Print array output and download its URL items in parallel
+ * @param {Array} output - Prediction output array
+ * @param {string} downloadDir - Directory to download outputs (null to skip)
+ */
+async function handleArrayOutput(output, downloadDir) {
+  console.log(`\nOutput (${output.length} items):`);
+  const urls = [];
+  for (let i = 0; i < output.length; i++) {
+    const item = output[i];
+    if (typeof item === 'string' && item.startsWith('http')) {
+      console.log(`  [${i}] ${item}`);
+      urls.push([i, item]);
+    } else {
+      console.log(`  [${i}] ${JSON.stringify(item)}`);
+    }
+  }
+
+  if (!downloadDir) return;
+
+  await mapConcurrent(urls, DOWNLOAD_CONCURRENCY, async ([i, item]) => {
+    const ext = getExtension(item) || '.bin';
+    const filename = `output_${i}${ext}`;
+    const outputPath = path.join(downloadDir, filename);
+    await downloadFile(item, outputPath);
+    console.log(`      Downloaded: ${outputPath}`);
+  });
+}
+
 /**
  * Handle prediction output
  * @param {object} prediction - Completed prediction
@@ -112,22 +145,7 @@ async function handleOutput(prediction, downloadDir, verbose) {
 
   // Handle different output types
   if (Array.isArray(output)) {
-    console.log(`\nOutput (${output.length} items):`);
-    for (let i = 0; i < output.length; i++) {
-      const item = output[i];
-      if (typeof item === 'string' && item.startsWith('http')) {
-        console.log(`  [${i}] ${item}`);
-        if (downloadDir) {
-          const ext = getExtension(item) || '.bin';
-          const filename = `output_${i}${ext}`;
-          const outputPath = path.join(downloadDir, filename);
-          await downloadFile(item, outputPath);
-          console.log(`      Downloaded: ${outputPath}`);
-        }
-      } else {
-        console.log(`  [${i}] ${JSON.stringify(item)}`);
-      }
-    }
+    await handleArrayOutput(output, downloadDir);
   } else if (typeof output === 'string') {
     if (output.startsWith('http')) {
       console.log(`\nOutput: ${output}`);
@@ -296,22 +314,7 @@ async function waitPrediction(predictionId, downloadPath, verbose) {
       console.log(`Downloaded: ${finalPath}`);
     }
   } else if (Array.isArray(output)) {
-    console.log(`\nOutput (${output.length} items):`);
-    for (let i = 0; i < output.length; i++) {
-      const item = output[i];
-      if (typeof item === 'string' && item.startsWith('http')) {
-        console.log(`  [${i}] ${item}`);
-        if (downloadPath) {
-          const ext = getExtension(item) || '.bin';
-          const filename = `output_${i}${ext}`;
-          const outputPath = path.join(downloadPath, filename);
-          await downloadFile(item, outputPath);
-          console.log(`      Downloaded: ${outputPath}`);
-        }
-      } else {
-        console.log(`  [${i}] ${JSON.stringify(item)}`);
-      }
-    }
+    await handleArrayOutput(output, downloadPath);
   } else {
     console.log(`\nOutput: ${JSON.stringify(output, null, 2)}`);
   }
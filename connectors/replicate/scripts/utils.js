@@ -8,12 +8,14 @@ import { ensureDeps } from '../../../system/shared/ensure-deps.js';
 ensureDeps(import.meta.url);
 
 // Shared utilities
-import { parseArgs as sharedParseArgs, sleep } from '../../../system/shared/utils.js';
+import { parseArgs as sharedParseArgs, sleep, withRetry } from '../../../system/shared/utils.js';
 
 // Built-in Node.js modules
 import path from 'path';
 import { fileURLToPath } from 'url';
 import fs from 'fs';
+import { Readable } from 'stream';
+import { pipeline } from 'stream/promises';
 
 // npm packages (dynamic import after dependency check)
 const dotenv = (await import('dotenv')).default;
@@ -26,12 +28,19 @@ const __dirname = path.dirname(fileURLToPath(import.meta.url));
 const memoryEnvPath = path.join(__dirname, '..', '..', '..', '..', 'memory', 'connectors', 'replicate', '.env');
 const localEnvPath = path.join(__dirname, '..', '.env');
 
+// Config is read from .env once per process; every API call reuses it
+let cachedConfig = null;
+
 /**
  * Load configuration from .env file and defaults
  * Priority: memory .env overrides > connector defaults
  * @returns {object} Configuration object
  */
 export function loadConfig() {
+  if (cachedConfig) {
+    return cachedConfig;
+  }
+
   if (fs.existsSync(memoryEnvPath)) {
     dotenv.config({ path: memoryEnvPath });
   } else if (fs.existsSync(localEnvPath)) {
@@ -49,13 +58,14 @@ export function loadConfig() {
     process.exit(1);
   }
 
-  return {
+  cachedConfig = {
     apiToken: process.env.REPLICATE_API_TOKEN,
     // User overrides from memory (optional)
     userImageModel: process.env.REPLICATE_IMAGE_MODEL || null,
     userVideoModel: process.env.REPLICATE_VIDEO_MODEL || null,
     userRembgModel: process.env.REPLICATE_REMBG_MODEL || null
   };
+  return cachedConfig;
 }
 
 /**
@@ -166,17 +176,27 @@ export async function apiRequest(endpoint, options = {}) {
     fetchOptions.body = JSON.stringify(options.body);
   }
 
-  const response = await fetch(url, fetchOptions);
-  const data = await response.json();
-
-  if (!response.ok) {
-    const error = new Error(data.detail || data.error || 'API request failed');
-    error.status = response.status;
-    error.details = data;
-    throw error;
-  }
+  // POST creates predictions (billed): retry it only on 429
+  return withRetry(async () => {
+    const response = await fetch(url, fetchOptions);
+
+    if (!response.ok) {
+      // Gateway errors (502/503/504) usually carry an HTML body, not JSON
+      const text = await response.text();
+      let data = null;
+      try {
+        data = JSON.parse(text);
+      } catch {
+        // Non-JSON error body
+      }
+      const error = new Error(data?.detail || data?.error || `API request failed: HTTP ${response.status}`);
+      error.status = response.status;
+      error.details = data ?? text;
+      throw error;
+    }
 
-  return data;
+    return response.json();
+  }, { idempotent: fetchOptions.method !== 'POST' });
 }
 
 /**
@@ -245,15 +265,14 @@ export async function downloadFile(url, outputPath) {
     throw new Error(`Failed to download: HTTP ${response.status}`);
   }
 
-  const buffer = Buffer.from(await response.arrayBuffer());
-
   // Ensure directory exists
   const dir = path.dirname(outputPath);
   if (!fs.existsSync(dir)) {
     fs.mkdirSync(dir, { recursive: true });
   }
 
-  fs.writeFileSync(outputPath, buffer);
+  // Stream chunks straight to disk instead of buffering the whole file
+  await pipeline(Readable.fromWeb(response.body), fs.createWriteStream(outputPath));
   return outputPath;
 }
 
@@ -54,6 +54,77 @@ export function sleep(ms) {
   return new Promise(resolve => setTimeout(resolve, ms));
 }
 
+// HTTP statuses and socket error codes worth retrying
+const RETRYABLE_STATUS = new Set([429, 500, 502, 503, 504]);
+const RETRYABLE_CODES = new Set(['ECONNRESET', 'ETIMEDOUT', 'ECONNREFUSED', 'EAI_AGAIN', 'UND_ERR_SOCKET', 'UND_ERR_CONNECT_TIMEOUT']);
+
+/**
+ * Retry an async call on transient failures with exponential backoff + jitter.
+ * Retries rate limits (429), 5xx, and dropped connections. Anything else,
+ * including 401/403, is thrown immediately.
+ * 
+ * Calls that create something (e.g. POST /predictions) may have succeeded
+ * server-side before a 5xx or reset; pass `idempotent: false` so only 429
+ * (rejected before processing) is retried and nothing is created twice.
+ * 
+ * @param {() => Promise<any>} fn - Call to attempt (reads `error.status` on failure)
+ * @param {object} [options]
+ * @param {number} [options.attempts=3] - Total attempts
+ * @param {number} [options.baseMs=2000] - First backoff delay; doubles each retry
+ * @param {boolean} [options.idempotent=true] - Safe to repeat after 5xx/resets
+ * @returns {Promise<any>} Result of the first successful attempt
+ * 
+ * @example
+ * const result = await withRetry(() => model.generateContent(request));
+ */
+export async function withRetry(fn, { attempts = 3, baseMs = 2000, idempotent = true } = {}) {
+  for (let attempt = 1; ; attempt++) {
+    try {
+      return await fn();
+    } catch (error) {
+      const code = error.code || error.cause?.code;
+      const transient = idempotent
+        ? RETRYABLE_STATUS.has(error.status) || RETRYABLE_CODES.has(code)
+        : error.status === 429;
+      if (!transient || attempt >= attempts) {
+        throw error;
+      }
+      const delay = baseMs * 2 ** (attempt - 1) + Math.random() * 1000;
+      console.error(`Transient error (${error.status || code}). Retrying in ${(delay / 1000).toFixed(1)}s...`);
+      await sleep(delay);
+    }
+  }
+}
+
+/**
+ * Map over items with a bounded number of concurrent async calls.
+ * Results keep input order. Handle per-item errors inside `fn` if one
+ * failure should not reject the whole batch.
+ * 
+ * @param {any[]} items - Items to process
+ * @param {number} limit - Maximum calls in flight
+ * @param {(item: any, index: number) => Promise<any>} fn - Async mapper
+ * @returns {Promise<any[]>} Results in input order
+ * 
+ * @example
+ * const results = await mapConcurrent(prompts, 5, prompt => generateImage(prompt));
+ */
+export async function mapConcurrent(items, limit, fn) {
+  const results = new Array(items.length);
+  let next = 0;
+
+  const worker = async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index], index);
+    }
+  };
+
+  const workers = Math.max(1, Math.min(limit, items.length));
+  await Promise.all(Array.from({ length: workers }, worker));
+  return results;
+}
+
 /**
  * Safe JSON parsing with user-friendly error handling.
  * Exits with error message if JSON is invalid.
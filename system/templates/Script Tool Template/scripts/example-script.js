@@ -34,116 +34,222 @@ ensureDeps(import.meta.url);
 // IMPORTS
 // ============================================================================
 
-// npm packages (dynamic import after dependency check)
-const { config } = await import('dotenv');
-
 // Built-in Node.js modules
-import { existsSync, mkdirSync, writeFileSync } from 'fs';
-import { dirname, join, resolve } from 'path';
+import { closeSync, copyFileSync, existsSync, mkdirSync, openSync, readFileSync, writevSync } from 'fs';
+import { join, resolve } from 'path';
 import { fileURLToPath } from 'url';
 
+// Shared utilities
+import { parseCliArgs, hasHelpFlag } from '../../../system/shared/cli-utils.js';
+
 // ============================================================================
 // ENVIRONMENT CONFIGURATION - Load from /memory/
 // ============================================================================
 
-const __filename = fileURLToPath(import.meta.url);
-const __dirname = dirname(__filename);
-
 // Navigate from script location to memory directory
 // Path: /cofounder/tools/[Tool Name]/scripts/ -> /memory/tools/[Tool Name]/
-const memoryEnvPath = resolve(__dirname, '../../../../memory/tools/[Tool Name]/.env');
-
-if (existsSync(memoryEnvPath)) {
-  config({ path: memoryEnvPath });
-} else {
-  console.log(`Warning: .env not found at ${memoryEnvPath}`);
-  console.log('   Create /memory/tools/[Tool Name]/.env with your configuration');
-  console.log('   See /memory/README.md for setup instructions');
-}
+// Resolved directly against import.meta.url: one constant, no intermediate
+// __filename/__dirname strings (avoid '#', '?' and '%' in the tool name)
+const memoryEnvPath = fileURLToPath(new URL('../../../../memory/tools/[Tool Name]/.env', import.meta.url));
 
 // Configuration - Load from environment (NEVER hardcode API keys/models)
-const API_KEY = process.env.API_KEY;
-const MODEL_NAME = process.env.MODEL_NAME;
+// Populated by loadEnv() once CLI parsing has succeeded
+let API_KEY;
+let MODEL_NAME;
+
+// Required environment variables; MISSING_ENV is computed once by loadEnv()
+const REQUIRED_ENV = Object.freeze(['API_KEY', 'MODEL_NAME']);
+let MISSING_ENV = [];
+
+async function loadEnv() {
+  // A parent process (e.g. a shell loop over many files) that already loaded
+  // this .env exports DOTENV_LOADED; skip the stat and dotenv import entirely
+  if (process.env.DOTENV_LOADED !== memoryEnvPath) {
+    // npm packages (dynamic import, deferred so --help never loads dotenv)
+    const { config } = await import('dotenv');
+
+    if (existsSync(memoryEnvPath)) {
+      config({ path: memoryEnvPath });
+      process.env.DOTENV_LOADED = memoryEnvPath;
+    } else {
+      console.log(`Warning: .env not found at ${memoryEnvPath}`);
+      console.log('   Create /memory/tools/[Tool Name]/.env with your configuration');
+      console.log('   See /memory/README.md for setup instructions');
+    }
+  }
+
+  API_KEY = process.env.API_KEY;
+  MODEL_NAME = process.env.MODEL_NAME;
+  MISSING_ENV = REQUIRED_ENV.filter(key => !process.env[key]);
+}
 
 // ============================================================================
 // CONFIGURATION
 // ============================================================================
 
 const DEFAULT_OUTPUT_DIR = './output';
-let VERBOSE = false;
+
+// Set to true when processInput() passes file input through unchanged;
+// main() then copies the file in the kernel (copy_file_range/sendfile)
+// without reading it into memory
+const PROCESS_IS_IDENTITY = false;
 
 // ============================================================================
 // HELPER FUNCTIONS
 // ============================================================================
 
 function validateConfig() {
-  if (!API_KEY) {
-    console.log('Error: API_KEY not found!');
-    console.log('   Add API_KEY to /memory/tools/[Tool Name]/.env');
-    process.exit(1);
-  }
-
-  if (!MODEL_NAME) {
-    console.log('Error: MODEL_NAME not found!');
-    console.log('   Add MODEL_NAME to /memory/tools/[Tool Name]/.env');
+  if (MISSING_ENV.length > 0) {
+    const message = MISSING_ENV
+      .map(key => `Error: ${key} not found!\n   Add ${key} to /memory/tools/[Tool Name]/.env\n`)
+      .join('');
+    process.stderr.write(message);
     process.exit(1);
   }
 
   return true;
 }
 
+// Directories already created by this process
+const createdDirs = new Set();
+
 function ensureOutputDirectory(outputDir) {
-  if (!existsSync(outputDir)) {
-    mkdirSync(outputDir, { recursive: true });
+  // outputDir arrives already resolved, so equivalent spellings share one cache entry
+  if (createdDirs.has(outputDir)) {
+    return outputDir;
   }
+  // recursive mkdir is a no-op (no EEXIST) when the directory already exists
+  mkdirSync(outputDir, { recursive: true });
+  createdDirs.add(outputDir);
   return outputDir;
 }
 
+// Output files queued by queueOutput() and written by flushPending()
+const pendingWrites = [];
+
+function queueOutput(outputFile, result) {
+  /**
+   * Queue a result for writing at the end of main().
+   *
+   * Accepts a string, a Buffer, or an array of chunks (e.g. header, body,
+   * footer). Buffers are written as-is. Each file is later written with one
+   * writev call, so chunks never need to be concatenated in memory first.
+   *
+   * @param {string} outputFile - Destination file path
+   * @param {Buffer|string|Array<Buffer|string>} result - Result data or chunks
+   */
+  const chunks = Array.isArray(result) ? result : [result];
+  const buffers = chunks.map(chunk => (Buffer.isBuffer(chunk) ? chunk : Buffer.from(String(chunk), 'utf8')));
+  pendingWrites.push([outputFile, buffers]);
+}
+
+function flushPending() {
+  /**
+   * Write every queued output file, one writev call per file.
+   */
+  for (const [outputFile, buffers] of pendingWrites) {
+    const fd = openSync(outputFile, 'w');
+    try {
+      writevSync(fd, buffers);
+    } finally {
+      closeSync(fd);
+    }
+  }
+  pendingWrites.length = 0;
+}
+
+// openSync error codes meaning "this argument is literal text, not a file"
+const NOT_A_FILE_CODES = new Set(['ENOENT', 'ENAMETOOLONG', 'ERR_INVALID_ARG_VALUE']);
+
+function readInput(inputArg) {
+  /**
+   * Resolve the input argument to input data.
+   *
+   * File paths are returned as a raw Buffer with no UTF-8 decode, so large
+   * files are never duplicated as a JS string. Decode only the slice you
+   * actually need: data.subarray(start, end).toString('utf8').
+   * Anything else is treated as literal input text.
+   *
+   * @param {string} inputArg - File path or literal text
+   * @returns {Buffer|string} Input data
+   */
+  // One open() answers "does it exist and is it readable"; the fd is then
+  // reused for the read instead of checking first and opening again
+  let fd;
+  try {
+    fd = openSync(inputArg, 'r');
+  } catch (e) {
+    if (NOT_A_FILE_CODES.has(e.code)) {
+      return inputArg;
+    }
+    throw e;
+  }
+  try {
+    return readFileSync(fd);
+  } finally {
+    closeSync(fd);
+  }
+}
+
 function processInput(inputData) {
   /**
    * Main processing logic.
    *
-   * @param {string} inputData - The data to process
-   * @returns {string} Processed result
+   * Collect output pieces in an array instead of growing a string with +=.
+   * queueOutput() writes the array as-is, so nothing is concatenated:
+   *
+   *   const parts = [];
+   *   for (const chunk of chunks) {
+   *     parts.push(transform(chunk));
+   *   }
+   *   return parts;
+   *
+   * @param {Buffer|string} inputData - The data to process
+   * @returns {Array<Buffer|string>} Processed result chunks
    */
-  const result = `Processed: ${inputData}`;
-  return result;
+  const parts = ['Processed: ', inputData];
+  return parts;
 }
 
 // ============================================================================
 // MAIN FUNCTION
 // ============================================================================
 
-function main(inputArg, outputDir = DEFAULT_OUTPUT_DIR) {
+function main(inputArg, outputDir = DEFAULT_OUTPUT_DIR, verbose = false) {
   /**
    * Main execution function.
    *
    * @param {string} inputArg - Input to process
-   * @param {string} outputDir - Output directory path
+   * @param {string} outputDir - Resolved output directory path
+   * @param {boolean} verbose - Enable verbose output
    * @returns {number} Exit code (0 for success, 1 for error)
    */
   try {
     validateConfig();
     const outputPath = ensureOutputDirectory(outputDir);
 
-    if (VERBOSE) {
+    if (verbose) {
       console.log(`Processing: ${inputArg}`);
       console.log(`Using model: ${MODEL_NAME}`);
     }
 
-    const result = processInput(inputArg);
-
-    // Write output
     const outputFile = join(outputPath, 'result.txt');
-    writeFileSync(outputFile, String(result));
 
-    console.log(`Success! Output saved to: ${outputFile}`);
+    if (PROCESS_IS_IDENTITY && existsSync(inputArg)) {
+      // Identity fast path: zero bytes enter the JS heap
+      copyFileSync(inputArg, outputFile);
+    } else {
+      const result = processInput(readInput(inputArg));
+
+      // Write output
+      queueOutput(outputFile, result);
+      flushPending();
+    }
+
+    process.stdout.write(`Success! Output saved to: ${outputFile}\n`);
     return 0;
   } catch (e) {
-    console.log(`Error: ${e.message}`);
-    if (VERBOSE) {
-      console.error(e.stack);
-    }
+    process.stderr.write(verbose ? `Error: ${e.message}\n${e.stack}\n` : `Error: ${e.message}\n`);
     return 1;
   }
 }
@@ -179,25 +285,30 @@ Configuration:
   process.exit(0);
 }
 
-// Parse CLI arguments
-const args = process.argv.slice(2);
+// Parse CLI arguments (single pass via the shared parser). The shared
+// parser takes --key value; split --key=value here so this script accepts both
+const argv = process.argv.slice(2).flatMap(arg => {
+  const eq = arg.indexOf('=');
+  if (!arg.startsWith('--') || eq <= 2) {
+    return [arg];
+  }
+  // An empty value (--key=) leaves a boolean flag rather than a '' positional
+  return eq < arg.length - 1 ? [arg.slice(0, eq), arg.slice(eq + 1)] : [arg.slice(0, eq)];
+});
+const { positional, flags } = parseCliArgs(argv);
 
-if (args.length === 0 || args.includes('--help') || args.includes('-h')) {
+if (positional.length === 0 || hasHelpFlag(flags)) {
   showHelp();
 }
 
-const inputArg = args[0];
-let outputDir = DEFAULT_OUTPUT_DIR;
+await loadEnv();
 
-for (let i = 0; i < args.length; i++) {
-  if (args[i] === '--output' && args[i + 1]) {
-    outputDir = args[i + 1];
-  } else if (args[i] === '--verbose' || args[i] === '-v') {
-    VERBOSE = true;
-  }
-}
+const inputArg = positional[0];
+// Resolved once here; everything downstream receives the absolute path
+const outputDir = resolve(typeof flags.output === 'string' ? flags.output : DEFAULT_OUTPUT_DIR);
+const verbose = Boolean(flags.verbose || flags.v);
 
-const exitCode = main(inputArg, outputDir);
+const exitCode = main(inputArg, outputDir, verbose);
 process.exit(exitCode);
 
 // ============================================================================
@@ -208,9 +319,11 @@ process.exit(exitCode);
  *
  * 1. Keep the ensureDeps import and call at the top (auto-installs dependencies)
  * 2. Use dynamic imports for npm packages: const { x } = await import('package');
+ *    Import them inside the function that needs them (see loadEnv()) so
+ *    --help stays fast
  * 3. Update the path to /memory/ in the environment loading section
  * 4. Replace [Tool Name] with your actual tool name
- * 5. Update validateConfig() with your required env vars
+ * 5. Update REQUIRED_ENV with your required env vars
  * 6. Implement processInput() with your actual logic
  * 7. Update CLI argument parsing as needed
  * 8. Delete this instructions section
@@ -219,6 +332,10 @@ process.exit(exitCode);
  * - Scripts at: /cofounder/tools/[Tool Name]/scripts/
  * - Memory at: /memory/tools/[Tool Name]/
  * - Relative: ../../../../memory/tools/[Tool Name]/.env
+ * - Keep it relative: do not bake an absolute path in at install time.
+ *   Workspaces are cloud-synced and mount at different roots per machine.
+ *   The path is resolved once per process at module load, so it costs
+ *   nothing per call.
  *
  * Dependency auto-install:
  * - The ensureDeps() call checks if node_modules exists
@@ -22,7 +22,7 @@ ensureDeps(import.meta.url, { layer: 'tools' });
 const sharp = (await import('sharp')).default;
 
 // Built-in Node.js modules
-import { existsSync, statSync } from 'fs';
+import { copyFileSync, existsSync, statSync } from 'fs';
 import { basename, dirname, extname } from 'path';
 import {
   parseCliArgs,
@@ -30,6 +30,9 @@ import {
   outputError
 } from '../../../system/shared/cli-utils.js';
 
+// Below this radius the exact Gaussian kernel is already small and cheap
+const FAST_BLUR_MIN_RADIUS = 4;
+
 // Parse CLI arguments
 function parseArgs(args) {
   const result = {
@@ -37,13 +40,17 @@ function parseArgs(args) {
     outputPath: null,
     grayscale: false,
     blur: null,
+    fastBlur: false,
     resize: null,
     crop: null,
     rotate: null,
     brightness: 1.0,
     contrast: 1.0,
     sharpness: 1.0,
-    format: null
+    format: null,
+    pngLevel: null,
+    webpQuality: null,
+    webpMethod: null
   };
 
   let i = 0;
@@ -56,6 +63,8 @@ function parseArgs(args) {
       result.grayscale = true;
     } else if (arg === '--blur' && args[i + 1]) {
       result.blur = parseFloat(args[++i]);
+    } else if (arg === '--fast-blur') {
+      result.fastBlur = true;
     } else if (arg === '--resize' && args[i + 1] && args[i + 2]) {
       result.resize = { width: parseInt(args[++i], 10), height: parseInt(args[++i], 10) };
     } else if (arg === '--crop' && args[i + 1] && args[i + 2]) {
@@ -71,6 +80,24 @@ function parseArgs(args) {
       result.contrast = parseFloat(args[++i]);
     } else if (arg === '--sharpness' && args[i + 1]) {
       result.sharpness = parseFloat(args[++i]);
+    } else if (arg === '--png-level' && args[i + 1]) {
+      const level = parseInt(args[++i], 10);
+      if (!(level >= 0 && level <= 9)) {
+        outputError(`--png-level must be an integer from 0 to 9, got: ${args[i]}`);
+      }
+      result.pngLevel = level;
+    } else if (arg === '--webp-quality' && args[i + 1]) {
+      const quality = parseInt(args[++i], 10);
+      if (!(quality >= 1 && quality <= 100)) {
+        outputError(`--webp-quality must be an integer from 1 to 100, got: ${args[i]}`);
+      }
+      result.webpQuality = quality;
+    } else if (arg === '--webp-method' && args[i + 1]) {
+      const method = parseInt(args[++i], 10);
+      if (!(method >= 0 && method <= 6)) {
+        outputError(`--webp-method must be an integer from 0 to 6, got: ${args[i]}`);
+      }
+      result.webpMethod = method;
     } else if (arg === '--format' && args[i + 1]) {
       result.format = args[++i].toLowerCase();
     } else if (!arg.startsWith('-')) {
@@ -101,6 +128,7 @@ Arguments:
 Options:
   --grayscale, -g         Convert image to grayscale (monochrome)
   --blur <radius>         Apply Gaussian Blur radius (e.g., 2.0)
+  --fast-blur             Approximate large blurs (radius 4+) with cascaded box blurs
   --resize <W> <H>        Resize image to specific dimensions (e.g., 1440 810)
   --crop <W> <H>          Center crop to specific dimensions
   --rotate <degrees>      Rotate image clockwise (90, 180, 270)
@@ -108,6 +136,9 @@ Options:
   --contrast <factor>     Adjust contrast factor (0.0 to 2.0, default: 1.0)
   --sharpness <factor>    Adjust sharpness factor (0.0 to 2.0, default: 1.0)
   --format <type>         Force output format conversion (png, jpg, jpeg, webp)
+  --png-level <0-9>       PNG zlib level (default: 9 with --format png, otherwise 6)
+  --webp-quality <1-100>  WebP quality for opaque images (default: 90)
+  --webp-method <0-6>     WebP encoder effort (default: 4, or 6 for transparent images)
   --help, -h              Show this help message
 
 Examples:
@@ -118,7 +149,7 @@ Examples:
 }
 
 async function processImage(options) {
-  const { inputPath, outputPath: outPath, grayscale, blur, resize, crop, rotate, brightness, contrast, sharpness, format } = options;
+  const { inputPath, outputPath: outPath, grayscale, blur, fastBlur, resize, crop, rotate, brightness, contrast, sharpness, format, pngLevel, webpQuality, webpMethod } = options;
 
   // Validate input
   if (!inputPath) {
@@ -131,8 +162,29 @@ async function processImage(options) {
 
   let outputPath = outPath || inputPath;
 
+  // Nothing to do: skip the decode/encode entirely. Encoder flags alone
+  // are a request to re-encode, so they count as work too.
+  const hasEdits = rotate || grayscale || crop || resize || (blur && blur > 0) ||
+    brightness !== 1.0 || contrast !== 1.0 || sharpness !== 1.0;
+  const hasEncoderOptions = pngLevel != null || webpQuality != null || webpMethod != null;
+  if (!hasEdits && !format && !hasEncoderOptions) {
+    if (outputPath === inputPath) {
+      console.log('Warning: No edits requested. Nothing to do.');
+      return;
+    }
+    if (extname(outputPath).toLowerCase() === extname(inputPath).toLowerCase()) {
+      console.log('No edits requested. Copying input unchanged.');
+      copyFileSync(inputPath, outputPath);
+      console.log(`Done! Saved to: ${outputPath}`);
+      return;
+    }
+  }
+
   try {
     console.log(`Opening: ${inputPath}`);
+    // sharp is libvips: the whole chain below runs as one demand-driven
+    // pipeline. sharp reads sequentially by default and switches to random
+    // access itself when an operation (e.g. 90/270 rotation) needs it.
     let image = sharp(inputPath);
     const metadata = await image.metadata();
 
@@ -155,59 +207,69 @@ async function processImage(options) {
       image = image.rotate(rotate);
     }
 
-    // 2. Cropping (Center Crop)
+    // 2. Grayscale (true grayscale color space, not just desaturated RGB)
+    // libvips converts to one band before resize/blur/enhance regardless of
+    // call order; listed here so the code reads in execution order. Every
+    // later stage then touches a third of the data.
+    if (grayscale) {
+      console.log('Converting to grayscale...');
+      image = image.grayscale().toColorspace('b-w');
+    }
+
+    // 3. Cropping (Center Crop)
+    // extract() before resize() is a pre-resize window in libvips: the crop
+    // and the Lanczos resize run in one pass with no intermediate image
+    let currentWidth = metadata.width;
+    let currentHeight = metadata.height;
     if (crop) {
-      console.log(`Center cropping to ${crop.width}x${crop.height}...`);
-      const left = Math.floor((metadata.width - crop.width) / 2);
-      const top = Math.floor((metadata.height - crop.height) / 2);
+      const width = Math.min(crop.width, metadata.width);
+      const height = Math.min(crop.height, metadata.height);
       image = image.extract({
-        left: Math.max(0, left),
-        top: Math.max(0, top),
-        width: Math.min(crop.width, metadata.width),
-        height: Math.min(crop.height, metadata.height)
+        left: Math.floor((metadata.width - width) / 2),
+        top: Math.floor((metadata.height - height) / 2),
+        width,
+        height
       });
+      currentWidth = width;
+      currentHeight = height;
     }
 
-    // 3. Resize
-    if (resize) {
-      const currentWidth = crop ? crop.width : metadata.width;
-      const currentHeight = crop ? crop.height : metadata.height;
-
-      if (currentWidth !== resize.width || currentHeight !== resize.height) {
+    // 4. Resize
+    const needsResize = resize && (currentWidth !== resize.width || currentHeight !== resize.height);
+    if (crop) {
+      console.log(needsResize
+        ? `Fused crop+resize: ${currentWidth}x${currentHeight} center crop to ${resize.width}x${resize.height}...`
+        : `Center cropping to ${currentWidth}x${currentHeight}...`);
+    }
+    if (needsResize) {
+      if (!crop) {
         console.log(`Resizing from ${currentWidth}x${currentHeight} to ${resize.width}x${resize.height}...`);
-        image = image.resize(resize.width, resize.height, { fit: 'fill' });
-      } else {
-        console.log('Dimensions already match target. Skipping resize.');
       }
-    }
-
-    // 4. Grayscale (true grayscale color space, not just desaturated RGB)
-    if (grayscale) {
-      console.log('Converting to grayscale...');
-      image = image.grayscale().toColorspace('b-w');
+      image = image.resize(resize.width, resize.height, { fit: 'fill' });
+    } else if (resize) {
+      console.log('Dimensions already match target. Skipping resize.');
     }
 
     // 5. Blur
     if (blur && blur > 0) {
-      console.log(`Applying blur (radius: ${blur})...`);
-      image = image.blur(blur);
+      if (fastBlur && blur >= FAST_BLUR_MIN_RADIUS) {
+        // Box-blur approximation: cost per pixel stays flat as the radius grows,
+        // where the exact Gaussian kernel widens with it
+        console.log(`Applying fast blur (radius: ${blur})...`);
+        image = image.blur({ sigma: blur, precision: 'approximate' });
+      } else {
+        console.log(`Applying blur (radius: ${blur})...`);
+        image = image.blur(blur);
+      }
     }
 
-    // 6. Enhancements - use modulate for brightness/contrast
+    // 6. Enhancements - brightness and contrast folded into one linear pass
     if (brightness !== 1.0 || contrast !== 1.0) {
-      // Sharp doesn't have direct contrast, but we can use modulate for brightness
-      // and linear for contrast-like effects
-      if (brightness !== 1.0) {
-        console.log(`Adjusting brightness: ${brightness}x`);
-        image = image.modulate({ brightness });
-      }
-      if (contrast !== 1.0) {
-        console.log(`Adjusting contrast: ${contrast}x`);
-        // Linear transformation: output = (input - 128) * contrast + 128
-        const a = contrast;
-        const b = 128 * (1 - contrast);
-        image = image.linear(a, b);
-      }
+      // contrast: (input - 128) * contrast + 128, then brightness scales the result
+      // => input * (contrast * brightness) + 128 * (1 - contrast) * brightness
+      // One per-pixel multiply-add (alpha untouched) instead of two full passes
+      console.log(`Adjusting brightness: ${brightness}x, contrast: ${contrast}x`);
+      image = image.linear(contrast * brightness, 128 * (1 - contrast) * brightness);
     }
 
     // 7. Sharpness
@@ -224,11 +286,23 @@ async function processImage(options) {
 
     // Set output format
     if (outputFormat === 'jpeg') {
+      // JPEG has no alpha: composite onto white in one fused libvips pass
+      // (otherwise transparent areas come out as whatever RGB lies under them)
+      if (metadata.hasAlpha) {
+        image = image.flatten({ background: '#ffffff' });
+      }
       image = image.jpeg({ quality: 90 });
     } else if (outputFormat === 'webp') {
-      image = image.webp({ quality: 90 });
+      // Transparent images (e.g. cut-out headshots) encode losslessly at max
+      // effort so edges stay clean; photos use lossy at the default effort
+      image = image.webp(metadata.hasAlpha
+        ? { lossless: true, effort: webpMethod ?? 6 }
+        : { quality: webpQuality ?? 90, effort: webpMethod ?? 4 });
     } else {
-      image = image.png({ compressionLevel: 9 });
+      // Level 9 costs several times the encode CPU of 6 for a few percent;
+      // keep it for explicit --format png deliverables
+      const compressionLevel = pngLevel ?? (outputFormat === 'png' ? 9 : 6);
+      image = image.png({ compressionLevel });
     }
 
     // Save result
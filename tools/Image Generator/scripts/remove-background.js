@@ -14,17 +14,16 @@ ensureDeps(import.meta.url, { layer: 'tools' });
 
 // npm packages (dynamic import after dependency check)
 const { config } = await import('dotenv');
-const Replicate = (await import('replicate')).default;
-const sharp = (await import('sharp')).default;
 
 // Built-in Node.js modules
-import { existsSync, readFileSync, writeFileSync, statSync, mkdirSync, renameSync } from 'fs';
+import { existsSync, readFileSync, writeFileSync, statSync, mkdirSync, renameSync, rmSync } from 'fs';
 import { dirname, basename, extname, resolve, join } from 'path';
 import { fileURLToPath } from 'url';
 import {
   parseCliArgs,
   hasHelpFlag
 } from '../../../system/shared/cli-utils.js';
+import { mapConcurrent } from '../../../system/shared/utils.js';
 
 // Environment setup - use Connector credential location
 const __filename = fileURLToPath(import.meta.url);
@@ -131,14 +130,54 @@ if (existsSync(defaultsPath)) {
 
 // Configuration
 const REPLICATE_API_TOKEN = process.env.REPLICATE_API_TOKEN;
+// Abort a stalled result download instead of hanging: no response, or no
+// data for this long. An idle limit, so large files on slow links still finish
+const DOWNLOAD_IDLE_TIMEOUT_MS = 60000;
+
+// One Replicate client per process, shared by every image in a batch
+let replicateClient = null;
+
+function getReplicateClient() {
+  if (!replicateClient) {
+    replicateClient = new Replicate({ auth: REPLICATE_API_TOKEN });
+  }
+  return replicateClient;
+}
+
+/**
+ * Download a URL into memory, aborting if the connection goes idle
+ * @param {string} url - URL to download
+ * @returns {Promise<Buffer>} Response body
+ */
+async function downloadBuffer(url) {
+  const controller = new AbortController();
+  let timer = setTimeout(() => controller.abort(), DOWNLOAD_IDLE_TIMEOUT_MS);
+  try {
+    const response = await fetch(url, { signal: controller.signal });
+    if (!response.ok) {
+      throw new Error(`Download failed: HTTP ${response.status}`);
+    }
+    const chunks = [];
+    for await (const chunk of response.body) {
+      clearTimeout(timer);
+      timer = setTimeout(() => controller.abort(), DOWNLOAD_IDLE_TIMEOUT_MS);
+      chunks.push(chunk);
+    }
+    return Buffer.concat(chunks);
+  } finally {
+    clearTimeout(timer);
+  }
+}
 
 /**
  * Remove background from an image using Replicate's rembg model
  * @param {string} inputPath - Path to local input image
  * @param {string} outputPath - Path to save the result (optional)
+ * @param {object} options - Options
+ * @param {number} options.width - Resize the result to this width before saving (optional)
  * @returns {Promise<string|null>} Path to saved image or null if failed
  */
-async function removeBackground(inputPath, outputPath = null) {
+async function removeBackground(inputPath, outputPath = null, { width = null } = {}) {
   if (!REPLICATE_API_TOKEN) {
     console.log('Error: REPLICATE_API_TOKEN not configured');
     console.log('Set up credentials at /memory/connectors/replicate/.env');
@@ -150,11 +189,14 @@ async function removeBackground(inputPath, outputPath = null) {
     return null;
   }
 
+  // Set once we start writing, so a failed write never leaves a partial file
+  let writingPath = null;
+
   try {
     console.log(`Removing background from: ${inputPath}`);
     console.log(`Using model: ${DEFAULT_MODEL.split(':')[0]}`);
 
-    const replicate = new Replicate({ auth: REPLICATE_API_TOKEN });
+    const replicate = getReplicateClient();
 
     // Read the image file and convert to base64 data URI
     const imageBuffer = readFileSync(inputPath);
@@ -185,13 +227,8 @@ async function removeBackground(inputPath, outputPath = null) {
     const imageUrl = output;
 
     console.log('Downloading result...');
-    const response = await fetch(imageUrl);
-    if (!response.ok) {
-      console.log(`Error downloading result: HTTP ${response.status}`);
-      return null;
-    }
-
-    const resultBuffer = Buffer.from(await response.arrayBuffer());
+    // rembg PNGs are a few MB; sharp needs the whole file to decode it anyway
+    const resultBuffer = await downloadBuffer(imageUrl);
 
     // Generate output path if not provided
     let finalPath = outputPath;
@@ -201,8 +238,28 @@ async function removeBackground(inputPath, outputPath = null) {
       finalPath = join(dir, `${name}_nobg.png`);
     }
 
-    // Save the result
-    writeFileSync(finalPath, resultBuffer);
+    const image = sharp(resultBuffer);
+    const metadata = width ? await image.metadata() : null;
+
+    writingPath = finalPath;
+    if (!width || metadata.width === width) {
+      // No resize needed: write the Replicate bytes as-is
+      if (width) {
+        console.log(`Width already ${width}px. Skipping resize.`);
+      }
+      writeFileSync(finalPath, resultBuffer);
+    } else {
+      // Width-only resize keeps the aspect ratio (libvips derives the height).
+      // Large downscales need no manual box pre-pass: libvips shrinks by the
+      // integer factor first, then finishes with Lanczos3
+      console.log(`Resizing to ${width}px width...`);
+      const info = await image
+        .resize({ width })
+        .png({ compressionLevel: 9 })
+        .toFile(finalPath);
+      console.log(`Resized to ${info.width}x${info.height}`);
+    }
+    writingPath = null;
 
     const fileSize = statSync(finalPath).size / 1024;
     console.log(`Background removed! Saved to: ${finalPath}`);
@@ -210,7 +267,10 @@ async function removeBackground(inputPath, outputPath = null) {
 
     return finalPath;
   } catch (e) {
-    console.log(`Error: ${e.message}`);
+    if (writingPath) {
+      rmSync(writingPath, { force: true });
+    }
+    console.log(`Error: ${e.name === 'AbortError' ? 'Download stalled, aborted' : e.message}`);
     return null;
   }
 }
@@ -222,40 +282,16 @@ async function removeBackground(inputPath, outputPath = null) {
  * @returns {Promise<boolean>} Success status
  */
 async function processHeadshot(inputPath, outputPath = null) {
-  // 1. Remove background
-  const tempOutput = await removeBackground(inputPath, outputPath);
+  // Background removal and resize in one step: the downloaded PNG is resized
+  // in memory and encoded once, never written, re-read and re-encoded
+  const finalPath = await removeBackground(inputPath, outputPath, { width: 1000 });
 
-  if (!tempOutput) {
+  if (!finalPath) {
     return false;
   }
 
-  // 2. Resize to 1000px wide
-  try {
-    console.log('Resizing to 1000px width...');
-
-    const image = sharp(tempOutput);
-    const metadata = await image.metadata();
-
-    const targetWidth = 1000;
-    const aspectRatio = metadata.height / metadata.width;
-    const targetHeight = Math.round(targetWidth * aspectRatio);
-
-    await image
-      .resize(targetWidth, targetHeight, { fit: 'fill' })
-      .png({ compressionLevel: 9 })
-      .toFile(tempOutput + '.tmp');
-
-    // Rename temp file to final
-    const { renameSync } = await import('fs');
-    renameSync(tempOutput + '.tmp', tempOutput);
-
-    console.log(`Resized to ${targetWidth}x${targetHeight}`);
-    console.log(`Final processed headshot ready: ${tempOutput}`);
-    return true;
-  } catch (e) {
-    console.log(`Error resizing image: ${e.message}`);
-    return false;
-  }
+  console.log(`Final processed headshot ready: ${finalPath}`);
+  return true;
 }
 
 // CLI
@@ -265,11 +301,17 @@ Background Removal Tool (using Replicate Connector)
 
 Usage:
   node remove-background.js input_image.jpg [output_path.png]
+  node remove-background.js --batch image1.jpg image2.jpg ... [--concurrency N]
 
 Arguments:
   input_image     Path to the input image
   output_path     Path to save the result (optional, defaults to input_nobg.png)
 
+Options:
+  --batch         Treat every positional as an input; each is saved as <name>_nobg.png
+  --concurrency N Images processed in parallel with --batch
+                  (default: REMBG_CONCURRENCY or 8)
+
 The tool removes the background and resizes to 1000px width (maintaining aspect ratio).
 Output is always PNG format to preserve transparency.
 
@@ -279,11 +321,33 @@ Default model: ${DEFAULT_MODEL.split(':')[0]}
 }
 
 const { positional, flags } = parseCliArgs(process.argv.slice(2));
+// The shared parser reads the word after --batch as its value; fold it back
+// into the input list
+if (typeof flags.batch === 'string') {
+  positional.unshift(flags.batch);
+}
 if (positional.length === 0 || hasHelpFlag(flags)) {
   showHelp();
   process.exit(hasHelpFlag(flags) ? 0 : 1);
 }
 
+// npm packages only needed for actual processing (loaded after the help check)
+const Replicate = (await import('replicate')).default;
+const sharp = (await import('sharp')).default;
+
+if (flags.batch) {
+  // Each image is a Replicate round trip (upload, inference, download), so
+  // overlapping them scales almost linearly until the pool limit
+  const concurrency = parseInt(flags.concurrency, 10) || parseInt(process.env.REMBG_CONCURRENCY, 10) || 8;
+  const results = await mapConcurrent(positional, concurrency, inputFile => processHeadshot(inputFile));
+  const failed = positional.filter((_, i) => !results[i]);
+  console.log(`\nProcessed ${positional.length - failed.length} of ${positional.length} images`);
+  for (const inputFile of failed) {
+    console.log(`  Failed: ${inputFile}`);
+  }
+  process.exit(failed.length === 0 ? 0 : 1);
+}
+
 const inputFile = positional[0];
 const outputFile = positional[1] || null;
 
@@ -25,7 +25,7 @@ echo ""
 # Install Python requirements
 echo "Installing Python dependencies..."
 echo "This will install:"
-echo "  - openai-whisper (speech recognition)"
+echo "  - faster-whisper (speech recognition)"
 echo "  - torch (deep learning framework)"
 echo "  - torchaudio (audio processing)"
 echo ""
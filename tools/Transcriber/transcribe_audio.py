@@ -12,6 +12,10 @@ Options:
     --model MODEL      Whisper model size: tiny, base, small, medium, large (default: base)
     --diarize          Enable speaker diarization (requires HuggingFace connector setup)
     --speakers N       Expected number of speakers (optional, improves diarization accuracy)
+    --compute-type T   Inference precision: int8, int8_float16, float16, float32
+                       (default: float16 on GPU, int8 on CPU)
+    --batch-size N     Transcribe VAD-split chunks in batches of N (long recordings)
+    --quality          Beam search with temperature fallback (slower, for noisy audio)
 
 Examples:
     python transcribe_audio.py recording.m4a                    # Basic transcription
@@ -24,28 +28,54 @@ Requirements:
 """
 
 import os
+import re
 import sys
 import argparse
 import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
+from itertools import accumulate
 import torch
-import whisper
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+from faster_whisper.audio import decode_audio
 
 # Supported audio formats
-SUPPORTED_FORMATS = ['.mp3', '.mp4', '.mpeg', '.mpga', '.m4a', '.wav', '.webm', '.ogg', '.flac']
+SUPPORTED_FORMATS = frozenset({'.mp3', '.mp4', '.mpeg', '.mpga', '.m4a', '.wav', '.webm', '.ogg', '.flac'})
 
 # Whisper models
 WHISPER_MODELS = ['tiny', 'base', 'small', 'medium', 'large']
 
+# CTranslate2 compute types (weights/activations precision)
+COMPUTE_TYPES = ['int8', 'int8_float16', 'float16', 'float32']
 
+# Temperature fallback ladder: a segment failing the compression ratio or
+# log-prob check is re-decoded at the next temperature (used with --quality)
+FALLBACK_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+# Whisper expects 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+# HuggingFace token line in the connector .env
+HF_TOKEN_LINE = re.compile(r'^[ \t]*HUGGINGFACE_API_TOKEN=(.*)$', re.MULTILINE)
+
+# Sentence end followed by the start of a new sentence (compiled once)
+SENTENCE_BREAK = re.compile(r'([.!?])\s+(?=[A-Z"\'])')
+
+
+@lru_cache(maxsize=1)
 def get_device():
     """
     Detect the best available device for inference.
     Priority: CUDA (NVIDIA) > CPU
     
-    Note: MPS (Apple Silicon) is disabled because Whisper uses sparse tensors
-    which are not fully supported on MPS, causing runtime errors.
+    Cached: detection (and CUDA context init) and the banner happen once,
+    and diarization and transcription always agree on the device.
+    
+    Note: MPS (Apple Silicon) is not used because faster-whisper's CTranslate2
+    backend only supports CUDA and CPU.
     """
     if torch.cuda.is_available():
         device = "cuda"
@@ -54,7 +84,7 @@ def get_device():
     else:
         device = "cpu"
         if torch.backends.mps.is_available():
-            print("Using CPU (MPS available but disabled due to Whisper compatibility)")
+            print("Using CPU (MPS available but not supported by faster-whisper)")
         else:
             print("Using CPU")
     return device
@@ -75,37 +105,39 @@ def get_hf_token():
     if not memory_path.exists():
         return None
     
-    # Parse .env file
+    # Parse .env file: one read, one compiled search for the key's line
     try:
-        with open(memory_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith('HUGGINGFACE_API_TOKEN='):
-                    return line.split('=', 1)[1].strip()
+        match = HF_TOKEN_LINE.search(memory_path.read_text())
     except Exception:
-        pass
+        return None
     
-    return None
+    return match.group(1).strip() if match else None
 
 
-def get_audio_duration(audio_file_path):
-    """Get audio duration in minutes using whisper's audio loading."""
-    try:
-        audio = whisper.load_audio(audio_file_path)
-        duration_seconds = len(audio) / whisper.audio.SAMPLE_RATE
-        return duration_seconds / 60
-    except Exception:
-        return None
+def load_audio(audio_file_path):
+    """
+    Decode an audio file once to a 16 kHz mono float32 waveform.
+    
+    The waveform is shared by diarization and transcription so the file is
+    never decoded more than once.
+    """
+    return decode_audio(audio_file_path, sampling_rate=SAMPLE_RATE)
+
+
+def get_audio_duration(audio):
+    """Get audio duration in minutes from a decoded 16 kHz waveform."""
+    return len(audio) / SAMPLE_RATE / 60
 
 
-def run_diarization(audio_file_path, hf_token, num_speakers=None):
+def run_diarization(audio, hf_token, num_speakers=None, device="cpu"):
     """
     Run speaker diarization using pyannote.audio.
     
     Args:
-        audio_file_path: Path to the audio file
+        audio: Decoded 16 kHz mono waveform (from load_audio)
         hf_token: HuggingFace API token
         num_speakers: Expected number of speakers (optional)
+        device: Torch device the pipeline runs on (from get_device)
         
     Returns:
         list of dicts: [{"start": float, "end": float, "speaker": str}, ...]
@@ -128,33 +160,42 @@ def run_diarization(audio_file_path, hf_token, num_speakers=None):
         )
         
         # Move to GPU if available
-        device = get_device()
-        if device == "cuda":
-            pipeline.to(torch.device("cuda"))
+        if device.startswith("cuda"):
+            pipeline.to(torch.device(device))
+            # Sliding windows have a fixed length, so autotuned cuDNN
+            # kernels are picked once and reused for every chunk
+            torch.backends.cudnn.benchmark = True
         
         print("Running speaker diarization...")
         start_time = time.time()
         
-        # Run diarization
-        if num_speakers:
-            diarization = pipeline(audio_file_path, num_speakers=num_speakers)
-        else:
-            diarization = pipeline(audio_file_path)
+        # Run diarization on the in-memory waveform; given a path, pyannote
+        # re-reads and re-decodes the file for every chunk it crops
+        audio_data = {
+            "waveform": torch.from_numpy(audio[None, :]),
+            "sample_rate": SAMPLE_RATE
+        }
+        # Inference only: skip autograd bookkeeping on every tensor
+        with torch.inference_mode():
+            if num_speakers:
+                diarization = pipeline(audio_data, num_speakers=num_speakers)
+            else:
+                diarization = pipeline(audio_data)
         
         diarize_time = time.time() - start_time
         print(f"Diarization completed in {diarize_time:.1f}s")
         
-        # Convert to list of segments
+        # Convert to list of segments, counting unique speakers in the same pass
         segments = []
+        speakers = set()
         for turn, _, speaker in diarization.itertracks(yield_label=True):
             segments.append({
                 "start": turn.start,
                 "end": turn.end,
                 "speaker": speaker
             })
+            speakers.add(speaker)
         
-        # Count unique speakers
-        speakers = set(seg["speaker"] for seg in segments)
         print(f"Identified {len(speakers)} speaker(s)")
         
         return segments
@@ -173,72 +214,124 @@ def run_diarization(audio_file_path, hf_token, num_speakers=None):
         sys.exit(1)
 
 
-def get_speaker_at_time(diarization_segments, start, end):
+def build_speaker_index(diarization_segments):
+    """
+    Precompute sorted lookup arrays over diarization segments for
+    get_speaker_at_time, so each lookup is a binary search instead of a scan.
+    
+    Args:
+        diarization_segments: List of diarization segments
+        
+    Returns:
+        dict: Sorted segments plus start, running-max end and midpoint arrays
+    """
+    segments = sorted(diarization_segments, key=lambda seg: seg["start"])
+    by_mid = sorted(((seg["start"] + seg["end"]) / 2, seg["speaker"]) for seg in segments)
+    
+    return {
+        "segments": segments,
+        "starts": [seg["start"] for seg in segments],
+        # Speaker turns can overlap, so raw end times are not sorted; their
+        # running max is, and bisecting it finds the first turn that can
+        # still overlap a given start time
+        "max_ends": list(accumulate((seg["end"] for seg in segments), max)),
+        "mids": [mid for mid, _ in by_mid],
+        "mid_speakers": [speaker for _, speaker in by_mid],
+    }
+
+
+def get_speaker_at_time(speaker_index, start, end):
     """
     Find which speaker was talking during a given time range.
     Uses overlap duration to handle boundary cases.
     
     Args:
-        diarization_segments: List of diarization segments
+        speaker_index: Lookup arrays from build_speaker_index
         start: Start time in seconds
         end: End time in seconds
         
     Returns:
         str: Speaker label (e.g., "SPEAKER_00")
     """
-    if not diarization_segments:
+    segments = speaker_index["segments"]
+    if not segments:
         return "SPEAKER_00"
     
-    # Calculate overlap with each speaker segment
+    # Only turns in [lo, hi) can overlap: they end after `start` and begin before `end`
+    lo = bisect_right(speaker_index["max_ends"], start)
+    hi = bisect_left(speaker_index["starts"], end)
+    
+    # Calculate overlap with each candidate speaker segment
     speaker_overlaps = {}
     
-    for seg in diarization_segments:
-        # Calculate overlap
-        overlap_start = max(start, seg["start"])
-        overlap_end = min(end, seg["end"])
-        overlap_duration = max(0, overlap_end - overlap_start)
+    for i in range(lo, hi):
+        seg = segments[i]
+        overlap_duration = min(end, seg["end"]) - max(start, seg["start"])
         
         if overlap_duration > 0:
             speaker = seg["speaker"]
             speaker_overlaps[speaker] = speaker_overlaps.get(speaker, 0) + overlap_duration
     
     if not speaker_overlaps:
-        # No overlap found; find nearest speaker
+        # No overlap found; find nearest speaker by segment midpoint
+        mids = speaker_index["mids"]
         mid_time = (start + end) / 2
-        closest_speaker = None
-        closest_distance = float('inf')
-        
-        for seg in diarization_segments:
-            seg_mid = (seg["start"] + seg["end"]) / 2
-            distance = abs(mid_time - seg_mid)
-            if distance < closest_distance:
-                closest_distance = distance
-                closest_speaker = seg["speaker"]
-        
-        return closest_speaker or "SPEAKER_00"
+        i = bisect_left(mids, mid_time)
+        if i == len(mids) or (i > 0 and mid_time - mids[i - 1] <= mids[i] - mid_time):
+            i -= 1
+        return speaker_index["mid_speakers"][i] or "SPEAKER_00"
     
     # Return speaker with most overlap
     return max(speaker_overlaps, key=speaker_overlaps.get)
 
 
-def transcribe_audio(audio_file_path, model_size='base'):
+def load_whisper_model(model_size, device, compute_type, cpu_threads=None):
+    """
+    Load a faster-whisper model, preferring the local model cache.
+    
+    Once a model has been downloaded it loads straight from disk, skipping
+    the HuggingFace Hub revision check (a network round trip on every run,
+    and a failure when offline). Falls back to downloading on first use.
+    
+    cpu_threads defaults to every core; pass fewer when another CPU-bound
+    pipeline runs alongside.
+    """
+    model_kwargs = {
+        "device": device,
+        "compute_type": compute_type,
+        "cpu_threads": cpu_threads or os.cpu_count() or 0,
+    }
+    try:
+        return WhisperModel(model_size, local_files_only=True, **model_kwargs)
+    except FileNotFoundError:
+        return WhisperModel(model_size, **model_kwargs)
+
+
+def transcribe_audio(audio_file_path, audio, model_size='base', compute_type=None, batch_size=None, quality=False,
+                     cpu_threads=None):
     """
-    Transcribe audio file using local Whisper model with GPU acceleration.
+    Transcribe audio file using local Whisper model (faster-whisper / CTranslate2).
     
     Args:
-        audio_file_path: Path to the audio file
+        audio_file_path: Path to the audio file (for progress messages)
+        audio: Decoded 16 kHz mono waveform (from load_audio)
         model_size: Whisper model size (tiny, base, small, medium, large)
+        compute_type: CTranslate2 compute type (default: float16 on GPU, int8 on CPU)
+        batch_size: Transcribe VAD-split ~30s chunks in batches of this size
+            (default: None, sequential decoding)
+        quality: Beam search (5) with the temperature fallback ladder instead
+            of a single greedy pass
+        cpu_threads: CTranslate2 threads on CPU (default: all cores)
         
     Returns:
-        dict: Whisper result with segments
+        dict: {"text": str, "segments": [{"start", "end", "text"}, ...]}
     """
     device = get_device()
-    use_fp16 = device == "cuda"
+    if compute_type is None:
+        # INT8 weights cut memory bandwidth ~4x on CPU with near-identical transcripts
+        compute_type = "float16" if device == "cuda" else "int8"
     
-    if use_fp16:
-        print("Using FP16 (half-precision) for faster inference")
-    else:
-        print("Using FP32 (full precision)")
+    print(f"Using {compute_type} compute type")
     
     print(f"\nLoading Whisper model '{model_size}'...")
     print("(First run will download the model - this may take a few minutes)")
@@ -246,12 +339,12 @@ def transcribe_audio(audio_file_path, model_size='base'):
     start_time = time.time()
     
     try:
-        model = whisper.load_model(model_size, device=device)
+        model = load_whisper_model(model_size, device, compute_type, cpu_threads)
         
         load_time = time.time() - start_time
         print(f"Model loaded in {load_time:.1f}s")
         
-        duration_min = get_audio_duration(audio_file_path)
+        duration_min = get_audio_duration(audio)
         if duration_min:
             print(f"\nAudio duration: {duration_min:.1f} minutes")
             if device != "cpu":
@@ -265,16 +358,48 @@ def transcribe_audio(audio_file_path, model_size='base'):
         
         transcribe_start = time.time()
         
-        result = model.transcribe(
-            audio_file_path,
-            verbose=False,
-            language='en',
-            fp16=use_fp16,
-            condition_on_previous_text=True,
-            compression_ratio_threshold=2.4,
-            logprob_threshold=-1.0,
-            no_speech_threshold=0.6,
-        )
+        if quality:
+            decode_options = {
+                "beam_size": 5,
+                "best_of": 5,
+                "temperature": list(FALLBACK_TEMPERATURES),
+            }
+        else:
+            # One greedy pass per segment: no beam, no re-decoding at higher
+            # temperatures when a segment fails the quality thresholds
+            decode_options = {"beam_size": 1, "best_of": 1, "temperature": 0.0}
+        
+        if batch_size:
+            # Split on VAD silence boundaries into ~30s chunks and decode them as
+            # a batch; chunks are independent, so no conditioning on prior text.
+            # Timestamps come back already offset to the full recording.
+            print(f"Batched transcription (batch size {batch_size})")
+            segments, _ = BatchedInferencePipeline(model=model).transcribe(
+                audio,
+                language='en',
+                batch_size=batch_size,
+                **decode_options,
+            )
+        else:
+            segments, _ = model.transcribe(
+                audio,
+                language='en',
+                condition_on_previous_text=True,
+                compression_ratio_threshold=2.4,
+                log_prob_threshold=-1.0,
+                no_speech_threshold=0.6,
+                **decode_options,
+            )
+        
+        # Segments are generated lazily; decoding happens while materializing
+        segments = [
+            {"start": seg.start, "end": seg.end, "text": seg.text}
+            for seg in segments
+        ]
+        result = {
+            "text": "".join(seg["text"] for seg in segments),
+            "segments": segments,
+        }
         
         transcribe_time = time.time() - transcribe_start
         total_time = time.time() - start_time
@@ -301,13 +426,17 @@ def merge_transcription_with_diarization(whisper_result, diarization_segments):
         diarization_segments: List of speaker segments from pyannote
         
     Returns:
-        list of dicts: [{"speaker": str, "start": float, "end": float, "text": str}, ...]
+        tuple: (merged, num_speakers) where merged is
+            [{"speaker": str, "start": float, "end": float, "text": str}, ...]
+            and num_speakers counts the speakers assigned to any segment
     """
     merged = []
+    speakers = set()
+    speaker_index = build_speaker_index(diarization_segments)
     
     for segment in whisper_result.get("segments", []):
         speaker = get_speaker_at_time(
-            diarization_segments,
+            speaker_index,
             segment["start"],
             segment["end"]
         )
@@ -318,8 +447,9 @@ def merge_transcription_with_diarization(whisper_result, diarization_segments):
             "end": segment["end"],
             "text": segment["text"].strip()
         })
+        speakers.add(speaker)
     
-    return merged
+    return merged, len(speakers)
 
 
 def format_timestamp(seconds):
@@ -338,9 +468,7 @@ def format_transcription_plain(text):
     """
     Format plain transcription with line breaks for readability.
     """
-    import re
-    formatted = re.sub(r'([.!?])\s+(?=[A-Z"\'])', r'\1\n\n', text)
-    return formatted
+    return SENTENCE_BREAK.sub(r'\1\n\n', text)
 
 
 def format_transcription_diarized(merged_segments):
@@ -361,12 +489,12 @@ def format_transcription_diarized(merged_segments):
                 "speaker": seg["speaker"],
                 "start": seg["start"],
                 "end": seg["end"],
-                "text": seg["text"]
+                "text": [seg["text"]]
             }
         elif seg["speaker"] == current_group["speaker"]:
-            # Same speaker, extend the group
+            # Same speaker, extend the group (fragments joined once at output)
             current_group["end"] = seg["end"]
-            current_group["text"] += " " + seg["text"]
+            current_group["text"].append(seg["text"])
         else:
             # Different speaker, save current and start new
             grouped.append(current_group)
@@ -374,7 +502,7 @@ def format_transcription_diarized(merged_segments):
                 "speaker": seg["speaker"],
                 "start": seg["start"],
                 "end": seg["end"],
-                "text": seg["text"]
+                "text": [seg["text"]]
             }
     
     # Don't forget the last group
@@ -386,13 +514,13 @@ def format_transcription_diarized(merged_segments):
     for group in grouped:
         timestamp = format_timestamp(group["start"])
         speaker = group["speaker"]
-        text = group["text"]
+        text = " ".join(group["text"])
         lines.append(f"{speaker} [{timestamp}]: {text}")
     
     return "\n\n".join(lines)
 
 
-def save_outputs(audio_file_path, transcription, diarized_segments=None):
+def save_outputs(audio_file_path, transcription, diarized_segments=None, num_speakers=None):
     """
     Save transcription as text file in the same directory as the audio file.
     
@@ -400,6 +528,7 @@ def save_outputs(audio_file_path, transcription, diarized_segments=None):
         audio_file_path: Original audio file path
         transcription: Whisper result or plain text
         diarized_segments: Optional merged diarization segments
+        num_speakers: Speaker count for the header (from the merge step)
     
     Returns:
         Path: transcription_file path
@@ -421,17 +550,20 @@ def save_outputs(audio_file_path, transcription, diarized_segments=None):
         formatted_content = format_transcription_plain(text)
         suffix = "_transcription"
     
-    # Save as plain text
+    # Build the whole document, then save as plain text in one write
+    header = [
+        "TRANSCRIPTION\n\n",
+        f"Audio File: {audio_path.name}\n",
+        f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+    ]
+    if diarized_segments:
+        if num_speakers is None:
+            num_speakers = len(set(seg["speaker"] for seg in diarized_segments))
+        header.append(f"Speakers: {num_speakers}\n")
+    header.append("\n---\n\n")
+    
     transcription_file = output_dir / f"{base_name}{suffix}.txt"
-    with open(transcription_file, 'w', encoding='utf-8') as f:
-        f.write(f"TRANSCRIPTION\n\n")
-        f.write(f"Audio File: {audio_path.name}\n")
-        f.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        if diarized_segments:
-            speakers = set(seg["speaker"] for seg in diarized_segments)
-            f.write(f"Speakers: {len(speakers)}\n")
-        f.write(f"\n---\n\n")
-        f.write(formatted_content)
+    transcription_file.write_text("".join(header) + formatted_content, encoding='utf-8')
     
     print(f"\nTranscription saved to: {transcription_file}")
     
@@ -453,6 +585,23 @@ def main():
         default='base',
         help='Whisper model size (default: base). Larger = more accurate but slower'
     )
+    parser.add_argument(
+        '--compute-type',
+        choices=COMPUTE_TYPES,
+        default=None,
+        help='Inference precision (default: float16 on GPU, int8 on CPU)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=None,
+        help='Transcribe VAD-split chunks in parallel batches of N (faster on long recordings)'
+    )
+    parser.add_argument(
+        '--quality',
+        action='store_true',
+        help='Beam search with temperature fallback (slower, helps on noisy audio)'
+    )
     parser.add_argument(
         '--diarize',
         action='store_true',
@@ -470,6 +619,9 @@ def main():
     model_size = args.model
     enable_diarization = args.diarize
     num_speakers = args.speakers
+    compute_type = args.compute_type
+    batch_size = args.batch_size
+    quality = args.quality
     
     # Validate file exists
     if not os.path.exists(audio_file_path):
@@ -480,7 +632,7 @@ def main():
     file_extension = Path(audio_file_path).suffix.lower()
     if file_extension not in SUPPORTED_FORMATS:
         print(f"Error: Unsupported file format: {file_extension}")
-        print(f"Supported formats: {', '.join(SUPPORTED_FORMATS)}")
+        print(f"Supported formats: {', '.join(sorted(SUPPORTED_FORMATS))}")
         sys.exit(1)
     
     print(f"\n{'=' * 80}")
@@ -490,6 +642,14 @@ def main():
         print("Speaker Diarization: ENABLED")
     print(f"{'=' * 80}\n")
     
+    # Decode once; diarization and transcription share the waveform
+    try:
+        audio = load_audio(audio_file_path)
+    except Exception as e:
+        print(f"Error: Could not decode audio: {str(e)}")
+        sys.exit(1)
+    
+    device = get_device()
     diarization_segments = None
     
     # Step 1: Run diarization if requested
@@ -503,16 +663,32 @@ def main():
             print("\nOr run without --diarize for basic transcription.")
             sys.exit(1)
         
-        diarization_segments = run_diarization(audio_file_path, hf_token, num_speakers)
+        if device.startswith("cuda"):
+            # On GPU, run sequentially so both models never share VRAM at once
+            diarization_segments = run_diarization(audio, hf_token, num_speakers, device)
     
     try:
         # Step 2: Transcribe audio
-        whisper_result = transcribe_audio(audio_file_path, model_size)
+        if enable_diarization and diarization_segments is None:
+            # On CPU the two pipelines are independent and both release the GIL
+            # inside native kernels: overlap them and join before the merge.
+            # Split the cores between them; each would otherwise start a
+            # thread per core and the two would oversubscribe the CPU.
+            cpu_count = os.cpu_count() or 2
+            whisper_threads = max(1, cpu_count // 2)
+            torch.set_num_threads(max(1, cpu_count - whisper_threads))
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                diarization_future = executor.submit(run_diarization, audio, hf_token, num_speakers, device)
+                whisper_result = transcribe_audio(audio_file_path, audio, model_size, compute_type, batch_size, quality,
+                                                  whisper_threads)
+                diarization_segments = diarization_future.result()
+        else:
+            whisper_result = transcribe_audio(audio_file_path, audio, model_size, compute_type, batch_size, quality)
         
         # Step 3: Merge if diarization was used
         if diarization_segments:
-            merged = merge_transcription_with_diarization(whisper_result, diarization_segments)
-            transcription_file = save_outputs(audio_file_path, whisper_result, merged)
+            merged, speaker_count = merge_transcription_with_diarization(whisper_result, diarization_segments)
+            transcription_file = save_outputs(audio_file_path, whisper_result, merged, speaker_count)
         else:
             transcription_file = save_outputs(audio_file_path, whisper_result)
         
@@ -15,20 +15,23 @@ ensureDeps(import.meta.url);
 const ffmpeg = (await import('fluent-ffmpeg')).default;
 
 // Built-in Node.js modules
-import { existsSync, mkdirSync, statSync } from 'fs';
-import { dirname, basename, extname, join } from 'path';
+import { copyFileSync, existsSync, mkdirSync, rmSync, statSync } from 'fs';
+import { tmpdir } from 'os';
+import { dirname, basename, extname, join, resolve } from 'path';
+import { Readable } from 'stream';
+
+// H.264 encoder for every re-encode, probed once per process
+let encoderPromise = null;
+
+// libx264 speed/size trade-off (ultrafast ... veryslow)
+const X264_PRESET = 'faster';
 
 /**
- * Trim video to specified time range
+ * Run a configured ffmpeg command to completion
  */
-function trimVideo(inputPath, outputPath, start, end) {
+function runCommand(command, outputPath) {
   return new Promise((resolve, reject) => {
-    console.log(`Trimming video: ${start}s to ${end}s`);
-
-    ffmpeg(inputPath)
-      .setStartTime(start)
-      .setDuration(end - start)
-      .output(outputPath)
+    command
       .on('end', () => resolve(outputPath))
       .on('error', reject)
       .run();
@@ -36,112 +39,339 @@ function trimVideo(inputPath, outputPath, start, end) {
 }
 
 /**
- * Resize video to specified dimensions
+ * Pick the H.264 encoder: h264_nvenc when an NVIDIA GPU can actually
+ * encode (ffmpeg builds list it even without a GPU), else libx264
  */
-function resizeVideo(inputPath, outputPath, width, height) {
-  return new Promise((resolve, reject) => {
-    console.log(`Resizing video to ${width}x${height}`);
+function detectEncoder() {
+  if (!encoderPromise) {
+    encoderPromise = new Promise(resolve => {
+      ffmpeg.getAvailableEncoders((err, encoders) => {
+        if (err || !encoders || !encoders.h264_nvenc) {
+          resolve('libx264');
+          return;
+        }
+
+        // Encode a few blank frames to confirm a usable GPU and driver
+        ffmpeg()
+          .input('color=black:s=256x256:d=0.1')
+          .inputFormat('lavfi')
+          .videoCodec('h264_nvenc')
+          .format('null')
+          .output('-')
+          .on('end', () => resolve('h264_nvenc'))
+          .on('error', () => resolve('libx264'))
+          .run();
+      });
+    });
+  }
+  return encoderPromise;
+}
 
-    ffmpeg(inputPath)
-      .size(`${width}x${height}`)
-      .output(outputPath)
-      .on('end', () => resolve(outputPath))
-      .on('error', reject)
-      .run();
-  });
+/**
+ * Output options for the chosen encoder
+ */
+function encoderOptions(encoder) {
+  if (encoder === 'h264_nvenc') {
+    // Constant-quality VBR, roughly matching libx264's default CRF 23
+    return ['-preset p4', '-rc vbr', '-cq 23', '-b:v 0'];
+  }
+  // 'faster' encodes roughly 2x quicker than x264's default 'medium' at
+  // the same CRF, for slightly larger files; x264 already uses all cores
+  return [`-preset ${X264_PRESET}`, '-crf 23'];
 }
 
 /**
- * Change video playback speed
+ * Run an encode with the detected encoder, retrying on libx264 if the
+ * hardware encoder fails (e.g. driver too old, session limit reached)
+ *
+ * @param {function} build - Returns a configured command for an encoder
+ * @param {string} outputPath - Output file path
  */
-function changeSpeed(inputPath, outputPath, factor) {
-  return new Promise((resolve, reject) => {
-    if (factor > 1) {
-      console.log(`Speeding up video by ${factor}x`);
+async function runEncode(build, outputPath) {
+  const encoder = await detectEncoder();
+  try {
+    return await runCommand(build(encoder), outputPath);
+  } catch (err) {
+    if (encoder === 'libx264') {
+      throw err;
+    }
+    console.log(`${encoder} failed (${err.message.split('\n')[0]}), retrying with libx264`);
+    return runCommand(build('libx264'), outputPath);
+  }
+}
+
+/**
+ * Build the drawtext filter for a text overlay
+ */
+function textOverlayFilter(text, position = 'center') {
+  // Position mapping for drawtext filter
+  let xPos, yPos;
+  switch (position) {
+    case 'top':
+      xPos = '(w-text_w)/2';
+      yPos = '50';
+      break;
+    case 'bottom':
+      xPos = '(w-text_w)/2';
+      yPos = 'h-100';
+      break;
+    default: // center
+      xPos = '(w-text_w)/2';
+      yPos = '(h-text_h)/2';
+  }
+
+  // Escape special characters in text
+  const escapedText = text.replace(/'/g, "'\\''").replace(/:/g, '\\:');
+
+  return `drawtext=text='${escapedText}':fontsize=50:fontcolor=white:borderw=2:bordercolor=black:x=${xPos}:y=${yPos}`;
+}
+
+/**
+ * Apply trim, resize, speed, text and audio removal in one ffmpeg pass
+ * Pixels are decoded once and encoded once, however many edits are chained.
+ *
+ * @param {string} inputPath - Input video
+ * @param {string} outputPath - Output video
+ * @param {object} edits - { trim: {start, end}, resize: {width, height},
+ *   speed: number, text: {text, position}, removeAudio: boolean }
+ */
+function editVideo(inputPath, outputPath, edits) {
+  const { trim, resize, speed, text } = edits;
+  const videoFilters = [];
+  let audioFilter = null;
+  let dropAudio = edits.removeAudio;
+
+  if (trim) {
+    console.log(`Trimming video: ${trim.start}s to ${trim.end}s`);
+  }
+
+  if (resize) {
+    console.log(`Resizing video to ${resize.width}x${resize.height}`);
+    videoFilters.push(`scale=${resize.width}:${resize.height}`);
+  }
+
+  if (speed) {
+    if (speed > 1) {
+      console.log(`Speeding up video by ${speed}x`);
     } else {
-      console.log(`Slowing down video to ${factor}x`);
+      console.log(`Slowing down video to ${speed}x`);
     }
 
     // Video speed filter: setpts=PTS/factor (faster) or setpts=PTS*factor (slower)
-    const videoFilter = `setpts=${(1 / factor).toFixed(3)}*PTS`;
+    videoFilters.push(`setpts=${(1 / speed).toFixed(3)}*PTS`);
     // Audio speed filter: atempo supports 0.5-2.0 range
-    const audioFilter = factor >= 0.5 && factor <= 2.0 ? `atempo=${factor}` : null;
-
-    let command = ffmpeg(inputPath).videoFilters(videoFilter);
-
-    if (audioFilter) {
-      command = command.audioFilters(audioFilter);
+    if (speed >= 0.5 && speed <= 2.0) {
+      audioFilter = `atempo=${speed}`;
     } else {
       // For extreme speed changes, remove audio
+      dropAudio = true;
+    }
+  }
+
+  if (text) {
+    console.log(`Adding text overlay: '${text.text}' at ${text.position}`);
+    videoFilters.push(textOverlayFilter(text.text, text.position));
+  }
+
+  if (edits.removeAudio) {
+    console.log('Removing audio');
+  }
+
+  // A plain resize can stay on the GPU end to end (NVDEC decode,
+  // scale_cuda, NVENC encode) with no copies through system memory;
+  // drawtext and setpts need frames in system memory
+  const gpuResize = resize && !speed && !text;
+
+  const build = encoder => {
+    const onGpu = gpuResize && encoder === 'h264_nvenc';
+    let command = ffmpeg(inputPath);
+
+    if (onGpu) {
+      command = command.inputOptions(['-hwaccel cuda', '-hwaccel_output_format cuda']);
+    }
+
+    if (trim) {
+      // Input-side seek and duration: the cut is in source time, before
+      // any speed change
+      command = command
+        .setStartTime(trim.start)
+        .inputOptions([`-t ${trim.end - trim.start}`]);
+    }
+
+    if (onGpu) {
+      command = command.videoFilters(`scale_cuda=${resize.width}:${resize.height}`);
+    } else if (videoFilters.length > 0) {
+      command = command.videoFilters(videoFilters);
+    }
+
+    if (dropAudio) {
       command = command.noAudio();
+    } else if (audioFilter) {
+      command = command.audioFilters(audioFilter);
     }
 
-    command
-      .output(outputPath)
-      .on('end', () => resolve(outputPath))
-      .on('error', reject)
-      .run();
-  });
+    return command
+      .videoCodec(encoder)
+      .outputOptions(encoder === 'copy' ? [] : encoderOptions(encoder))
+      .output(outputPath);
+  };
+
+  // Only dropping audio: remux the video stream untouched
+  if (!trim && videoFilters.length === 0) {
+    return runCommand(build('copy'), outputPath);
+  }
+
+  return runEncode(build, outputPath);
 }
 
 /**
- * Add text overlay to video
+ * Probe a video's first video stream, its first audio stream (codec null
+ * if silent) and its duration in seconds
+ * @returns {Promise<{codec, width, height, pixFmt, frameRate, timeBase,
+ *   audioCodec, sampleRate, channels, duration}>}
  */
-function addTextOverlay(inputPath, outputPath, text, position = 'center') {
+function probeVideo(inputPath) {
   return new Promise((resolve, reject) => {
-    console.log(`Adding text overlay: '${text}' at ${position}`);
-
-    // Position mapping for drawtext filter
-    let xPos, yPos;
-    switch (position) {
-      case 'top':
-        xPos = '(w-text_w)/2';
-        yPos = '50';
-        break;
-      case 'bottom':
-        xPos = '(w-text_w)/2';
-        yPos = 'h-100';
-        break;
-      default: // center
-        xPos = '(w-text_w)/2';
-        yPos = '(h-text_h)/2';
-    }
-
-    // Escape special characters in text
-    const escapedText = text.replace(/'/g, "'\\''").replace(/:/g, '\\:');
-
-    ffmpeg(inputPath)
-      .videoFilters(`drawtext=text='${escapedText}':fontsize=50:fontcolor=white:borderw=2:bordercolor=black:x=${xPos}:y=${yPos}`)
-      .output(outputPath)
-      .on('end', () => resolve(outputPath))
-      .on('error', reject)
-      .run();
+    ffmpeg.ffprobe(inputPath, (err, metadata) => {
+      if (err) {
+        reject(err);
+        return;
+      }
+      const video = metadata.streams.find(stream => stream.codec_type === 'video');
+      if (!video) {
+        reject(new Error(`No video stream in ${inputPath}`));
+        return;
+      }
+      const audio = metadata.streams.find(stream => stream.codec_type === 'audio');
+      resolve({
+        codec: video.codec_name,
+        width: video.width,
+        height: video.height,
+        pixFmt: video.pix_fmt,
+        frameRate: video.r_frame_rate,
+        timeBase: video.time_base,
+        audioCodec: audio ? audio.codec_name : null,
+        sampleRate: audio ? audio.sample_rate : null,
+        channels: audio ? audio.channels : null,
+        // Some containers carry no format duration; fall back to the stream
+        duration: Number(metadata.format.duration) || Number(video.duration) || null
+      });
+    });
   });
 }
 
+// Containers that accept -movflags +faststart
+const FASTSTART_EXTENSIONS = new Set(['.mp4', '.m4v', '.mov']);
+
 /**
- * Remove audio from video
+ * Concatenate videos without re-encoding (concat demuxer + stream copy)
+ * All inputs must share codec, resolution, pixel format, frame rate and
+ * audio format, e.g. clips from the same generator or camera. Packets are
+ * remuxed as-is.
  */
-function removeAudio(inputPath, outputPath) {
-  return new Promise((resolve, reject) => {
-    console.log('Removing audio');
+function concatenateVideosCopy(inputPaths, outputPath) {
+  console.log(`Concatenating ${inputPaths.length} videos (stream copy)`);
+
+  // Concat list: one absolute path per line, single quotes escaped.
+  // Fed to ffmpeg over stdin, so no list file is written or cleaned up.
+  const list = inputPaths
+    .map(p => `file '${resolve(p).replace(/'/g, "'\\''")}'\n`)
+    .join('');
+
+  // Moving the index to the front only applies to MP4-family containers
+  const outputOptions = ['-c copy'];
+  if (FASTSTART_EXTENSIONS.has(extname(outputPath).toLowerCase())) {
+    outputOptions.push('-movflags +faststart');
+  }
 
-    ffmpeg(inputPath)
-      .noAudio()
-      .output(outputPath)
-      .on('end', () => resolve(outputPath))
-      .on('error', reject)
-      .run();
-  });
+  const command = ffmpeg()
+    .input(Readable.from([list]))
+    .inputOptions(['-f concat', '-safe 0', '-protocol_whitelist file,pipe'])
+    .outputOptions(outputOptions)
+    .output(outputPath);
+
+  return runCommand(command, outputPath);
 }
 
 /**
  * Concatenate multiple videos
  */
-function concatenateVideos(inputPaths, outputPath) {
-  return new Promise((resolve, reject) => {
-    console.log(`Concatenating ${inputPaths.length} videos`);
+async function concatenateVideos(inputPaths, outputPath, { copy = false } = {}) {
+  if (inputPaths.length === 1) {
+    // Nothing to join. Same container: copy the file in the kernel; a
+    // different container (e.g. .mov to .mp4) still needs a remux
+    if (extname(inputPaths[0]).toLowerCase() !== extname(outputPath).toLowerCase()) {
+      return concatenateVideosCopy(inputPaths, outputPath);
+    }
+    console.log('Only one input, copying it unchanged');
+    copyFileSync(inputPaths[0], outputPath);
+    return outputPath;
+  }
+
+  if (copy) {
+    return concatenateVideosCopy(inputPaths, outputPath);
+  }
+
+  const probes = await Promise.all(inputPaths.map(probeVideo));
+  const first = probes[0];
+
+  // Only identical stream parameters can be joined packet-for-packet with
+  // no decode or encode; a different frame rate, time base, sample rate or
+  // channel layout breaks timestamps or audio under -c copy
+  const STREAM_KEYS = ['codec', 'width', 'height', 'pixFmt', 'frameRate', 'timeBase',
+    'audioCodec', 'sampleRate', 'channels'];
+  const sameFormat = probes.every(p => STREAM_KEYS.every(key => p[key] === first[key]));
+  if (sameFormat) {
+    return concatenateVideosCopy(inputPaths, outputPath);
+  }
+
+  console.log(`Concatenating ${inputPaths.length} videos`);
+
+  const { width, height } = first;
+  const sameSize = probes.every(p => p.width === width && p.height === height);
+
+  if (!sameSize) {
+    console.log(`Inputs differ in size, fitting all to ${width}x${height}`);
+  }
+
+  // Clips from video models are often silent. Keep an audio track if any
+  // input has one; silent clips then get generated silence of their own
+  // length so every segment feeds the concat filter a video and audio pad
+  const withAudio = probes.some(p => p.audioCodec);
+
+  // All clips are decoded, filtered and joined by one ffmpeg process
+  const filters = [];
+  const segments = probes.map((p, i) => {
+    let segment = `[${i}:v]`;
+    if (!sameSize) {
+      // Same-size clips go straight into concat; only mismatched sizes
+      // are fitted (scale + letterbox pad) to the first clip
+      filters.push(
+        `[${i}:v]scale=${width}:${height}:force_original_aspect_ratio=decrease,` +
+        `pad=${width}:${height}:(ow-iw)/2:(oh-ih)/2,setsar=1[v${i}]`
+      );
+      segment = `[v${i}]`;
+    }
+    if (withAudio) {
+      if (p.audioCodec) {
+        segment += `[${i}:a]`;
+      } else {
+        // Unknown duration: emit one sample and let concat pad the segment's
+        // audio with silence up to its video length
+        const trim = p.duration ? `duration=${p.duration}` : 'end_sample=1';
+        filters.push(`anullsrc=r=48000:cl=stereo,atrim=${trim}[a${i}]`);
+        segment += `[a${i}]`;
+      }
+    }
+    return segment;
+  });
+  const outputs = withAudio ? ['outv', 'outa'] : ['outv'];
+  filters.push(
+    `${segments.join('')}concat=n=${inputPaths.length}:v=1:a=${withAudio ? 1 : 0}` +
+    outputs.map(label => `[${label}]`).join('')
+  );
 
+  return runEncode(encoder => {
     const command = ffmpeg();
 
     // Add all input files
@@ -149,15 +379,12 @@ function concatenateVideos(inputPaths, outputPath) {
       command.input(path);
     });
 
-    // Use concat filter
-    const filterInputs = inputPaths.map((_, i) => `[${i}:v][${i}:a]`).join('');
-    command
-      .complexFilter(`${filterInputs}concat=n=${inputPaths.length}:v=1:a=1[outv][outa]`, ['outv', 'outa'])
-      .output(outputPath)
-      .on('end', () => resolve(outputPath))
-      .on('error', reject)
-      .run();
-  });
+    return command
+      .complexFilter(filters, outputs)
+      .videoCodec(encoder)
+      .outputOptions(encoderOptions(encoder))
+      .output(outputPath);
+  }, outputPath);
 }
 
 /**
@@ -171,7 +398,11 @@ function extractFrames(inputPath, outputDir, fps = 1) {
       mkdirSync(outputDir, { recursive: true });
     }
 
+    // Frames leave ffmpeg as PNG anyway, so hardware decode (when the
+    // platform has one) only takes work off the CPU; ffmpeg falls back
+    // to software decoding if no accelerator initializes
     ffmpeg(inputPath)
+      .inputOptions(['-hwaccel auto'])
       .outputOptions([`-vf fps=${fps}`])
       .output(join(outputDir, 'frame_%04d.png'))
       .on('end', () => {
@@ -186,17 +417,31 @@ function extractFrames(inputPath, outputDir, fps = 1) {
 /**
  * Convert video to GIF
  */
-function createGif(inputPath, outputPath, fps = 10) {
-  return new Promise((resolve, reject) => {
-    console.log(`Creating GIF at ${fps} fps`);
+async function createGif(inputPath, outputPath, fps = 10) {
+  console.log(`Creating GIF at ${fps} fps`);
 
-    ffmpeg(inputPath)
-      .outputOptions([`-vf fps=${fps},scale=480:-1:flags=lanczos`, '-loop 0'])
-      .output(outputPath)
-      .on('end', () => resolve(outputPath))
-      .on('error', reject)
-      .run();
-  });
+  // Two passes through a temp palette: pass 1 builds a 256-colour palette
+  // tuned to this clip, pass 2 maps frames onto it as they stream. Memory
+  // stays flat with clip length (a one-pass split would buffer every
+  // frame until palettegen reached the end).
+  const frameFilter = `fps=${fps},scale=480:-1:flags=lanczos`;
+  const palettePath = join(tmpdir(), `gif_palette_${process.pid}_${Date.now()}.png`);
+
+  try {
+    await runCommand(ffmpeg(inputPath)
+      .outputOptions([`-vf ${frameFilter},palettegen`, '-y'])
+      .output(palettePath), palettePath);
+
+    await runCommand(ffmpeg(inputPath)
+      .input(palettePath)
+      .complexFilter(`[0:v]${frameFilter}[x];[x][1:v]paletteuse`)
+      .outputOptions(['-loop 0'])
+      .output(outputPath), outputPath);
+  } finally {
+    rmSync(palettePath, { force: true });
+  }
+
+  return outputPath;
 }
 
 // CLI
@@ -225,6 +470,9 @@ Examples:
   
   # Concatenate videos
   node local-video-edit.js video1.mp4 video2.mp4 video3.mp4 --concat output.mp4
+
+  # Force stream copy (skips the format check)
+  node local-video-edit.js part1.mp4 part2.mp4 --concat output.mp4 --copy
   
   # Extract frames
   node local-video-edit.js input.mp4 --extract-frames ./frames/ --fps 1
@@ -243,9 +491,13 @@ Options:
   --text-position <pos>         Text position: top, center, bottom (default: center)
   --remove-audio                Remove audio track
   --concat <output>             Concatenate multiple inputs to output
+  --copy                        Force concatenation without re-encoding (done
+                                automatically when all inputs share codec,
+                                resolution, frame rate and audio format)
   --extract-frames <dir>        Extract frames to directory
   --gif                         Output as GIF
-  --fps <number>                Frames per second (for extraction/GIF)
+  --fps <number>                Frames per second (extraction default 1, GIF
+                                default 10; fractions allowed, e.g. 0.5)
   --help, -h                    Show this help message
 
 Requires: FFmpeg installed on system
@@ -272,9 +524,11 @@ const options = {
   textPosition: 'center',
   removeAudio: false,
   concat: null,
+  copy: false,
   extractFrames: null,
   gif: false,
-  fps: 10
+  // Unset: each mode uses its own default (frames 1, GIF 10)
+  fps: undefined
 };
 
 let i = 0;
@@ -295,12 +549,15 @@ while (i < args.length) {
     options.removeAudio = true;
   } else if (arg === '--concat' && args[i + 1]) {
     options.concat = args[++i];
+  } else if (arg === '--copy') {
+    options.copy = true;
   } else if (arg === '--extract-frames' && args[i + 1]) {
     options.extractFrames = args[++i];
   } else if (arg === '--gif') {
     options.gif = true;
   } else if (arg === '--fps' && args[i + 1]) {
-    options.fps = parseInt(args[++i], 10);
+    // Fractional rates are valid: 0.5 = one frame every 2 seconds
+    options.fps = parseFloat(args[++i]);
   } else if (!arg.startsWith('-')) {
     options.inputs.push(arg);
   }
@@ -308,12 +565,17 @@ while (i < args.length) {
   i++;
 }
 
+if (options.fps !== undefined && !(options.fps > 0)) {
+  console.log('Error: --fps must be a positive number');
+  process.exit(1);
+}
+
 // Handle special modes
 async function main() {
   try {
     // Concatenation mode
     if (options.concat) {
-      await concatenateVideos(options.inputs, options.concat);
+      await concatenateVideos(options.inputs, options.concat, { copy: options.copy });
       const fileSize = statSync(options.concat).size / 1024;
       console.log(`\nSuccess! Video saved to: ${options.concat}`);
       console.log(`File size: ${fileSize.toFixed(2)} KB`);
@@ -364,56 +626,13 @@ async function main() {
       showHelp();
     }
 
-    // Apply operations sequentially using temp files
-    let currentInput = inputPath;
-    const tempFiles = [];
-    const operations = [];
-
-    if (options.trim) operations.push(['trim', options.trim]);
-    if (options.resize) operations.push(['resize', options.resize]);
-    if (options.speed) operations.push(['speed', options.speed]);
-    if (options.text) operations.push(['text', { text: options.text, position: options.textPosition }]);
-    if (options.removeAudio) operations.push(['removeAudio', null]);
-
-    for (let j = 0; j < operations.length; j++) {
-      const [op, params] = operations[j];
-      const isLast = j === operations.length - 1;
-      const currentOutput = isLast ? outputPath : `/tmp/video_edit_${Date.now()}_${j}.mp4`;
-
-      if (!isLast) {
-        tempFiles.push(currentOutput);
-      }
-
-      switch (op) {
-        case 'trim':
-          await trimVideo(currentInput, currentOutput, params.start, params.end);
-          break;
-        case 'resize':
-          await resizeVideo(currentInput, currentOutput, params.width, params.height);
-          break;
-        case 'speed':
-          await changeSpeed(currentInput, currentOutput, params);
-          break;
-        case 'text':
-          await addTextOverlay(currentInput, currentOutput, params.text, params.position);
-          break;
-        case 'removeAudio':
-          await removeAudio(currentInput, currentOutput);
-          break;
-      }
-
-      currentInput = currentOutput;
-    }
-
-    // Clean up temp files
-    for (const tempFile of tempFiles) {
-      try {
-        const { unlinkSync } = await import('fs');
-        unlinkSync(tempFile);
-      } catch {
-        // Ignore cleanup errors
-      }
-    }
+    await editVideo(inputPath, outputPath, {
+      trim: options.trim,
+      resize: options.resize,
+      speed: options.speed,
+      text: options.text ? { text: options.text, position: options.textPosition } : null,
+      removeAudio: options.removeAudio
+    });
 
     const fileSize = statSync(outputPath).size / 1024;
     console.log(`\nSuccess! Video saved to: ${outputPath}`);